@@ -0,0 +1,124 @@
+"""
+Texturatlas: alle Kacheltexturen eines Texturpakets in einem einzigen Surface.
+
+'rects' gibt zu jedem Namen den Bereich im Atlas an. Damit kann das Spiel alle Felder mit einem
+einzigen Aufruf von Surface.blits zeichnen, statt pro Sprite einmal Surface.blit aufzurufen.
+
+Gespeichert wird ein Atlas als PNG mit einer gleichnamigen JSON-Datei daneben:
+    <Name>.png, <Name>.json = {"version": 1, "rects": {"APPLE": [x, y, Breite, Höhe], ...}}
+"""
+# Standardbibliothek
+from typing import Dict
+import json
+import os
+
+# externe Bibliothek
+import pygame
+
+ATLAS_VERSION = 1
+ATLAS_NAME = "atlas"
+
+def edge_key(name: str, mask: int) -> str:
+    """Name einer Textur mit Kanten im Atlas, 'mask' wie in TexturePack.with_edges"""
+    return f"{name}:{mask}"
+
+class TextureAtlas:
+    def __init__(self, surface: pygame.Surface, rects: Dict[str, pygame.Rect]):
+        self.surface = surface
+        self.rects = rects
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.rects
+
+    def area(self, name: str) -> pygame.Rect:
+        return self.rects[name]
+
+    @classmethod
+    def build(cls, textures: Dict[str, pygame.Surface]) -> "TextureAtlas":
+        """
+        Packt die Texturen zeilenweise in ein Surface (die höchsten zuerst). Eine Zeile ist höchstens
+        so breit wie ein ungefähr quadratischer Atlas
+        """
+        if not textures:
+            return cls(pygame.Surface((1, 1), pygame.SRCALPHA), {})
+        area = sum(surface.get_width() * surface.get_height() for surface in textures.values())
+        widest = max(surface.get_width() for surface in textures.values())
+        max_width = max(widest, int(area ** 0.5) + 1)
+
+        rects = {}
+        x = y = row_height = 0
+        for name, surface in sorted(textures.items(), key=lambda item: -item[1].get_height()):
+            width, height = surface.get_size()
+            if x + width > max_width: # neue Zeile
+                x = 0
+                y += row_height
+                row_height = 0
+            rects[name] = pygame.Rect(x, y, width, height)
+            x += width
+            row_height = max(row_height, height)
+
+        size = (max(rect.right for rect in rects.values()), max(rect.bottom for rect in rects.values()))
+        atlas = pygame.Surface(size, pygame.SRCALPHA)
+        if pygame.display.get_surface() is not None:
+            atlas = atlas.convert_alpha() # Im Format des Bildschirms geht das Blitten schneller
+        atlas.fill((0, 0, 0, 0))
+        atlas.blits([(textures[name], rect) for name, rect in rects.items()], False)
+        return cls(atlas, rects)
+
+    @classmethod
+    def from_texturepack(cls, texturepack) -> "TextureAtlas":
+        """Baut den Atlas aus den Texturen eines geladenen TexturePack (ohne den Hintergrund)"""
+        textures = {name: surface for name, surface in texturepack._textures.items() if name != "BACKGROUND"}
+        for (name, mask), surface in texturepack._edged.items():
+            textures[edge_key(name, mask)] = surface
+        return cls.build(textures)
+
+    @classmethod
+    def from_folder(cls, folder: str, settings) -> "TextureAtlas":
+        """Baut den Atlas für ein Texturpaket aus dem textures Ordner, z.B. 'default'"""
+        from sprites import TexturePack
+        return TexturePack(folder, settings).atlas
+
+    def save(self, path: str) -> None:
+        """Speichert den Atlas als 'path'.png und 'path'.json"""
+        pygame.image.save(self.surface, f"{path}.png")
+        with open(f"{path}.json", "w") as file:
+            json.dump({"version": ATLAS_VERSION,
+                       "rects": {name: list(rect) for name, rect in self.rects.items()}}, file, indent=4)
+
+    @classmethod
+    def load(cls, path: str) -> "TextureAtlas":
+        with open(f"{path}.json", "r") as file:
+            content = json.load(file)
+        if content.get("version") != ATLAS_VERSION:
+            raise ValueError(f"{path}.json ist kein Texturatlas (Version {ATLAS_VERSION})")
+        surface = pygame.image.load(f"{path}.png")
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha()
+        return cls(surface, {name: pygame.Rect(rect) for name, rect in content["rects"].items()})
+
+def main(args=None) -> None:
+    """Schreibt den Atlas eines Texturpakets als <Ausgabe>.png und <Ausgabe>.json"""
+    import argparse
+    from settings import Settings
+    from sprites import TEXTURES_DIRECTORY, TEXTURE_CACHE
+    parser = argparse.ArgumentParser(prog="atlas.py", description="Erstellt den Texturatlas eines Texturpakets")
+    parser.add_argument("texturepack", nargs="?", default="default", help="Name des Ordners in 'textures'")
+    parser.add_argument("--output", default=None,
+                        help="Pfad ohne Endung (Standard: textures/<Texturpaket>/__texturecache__/atlas)")
+    args = parser.parse_args(args)
+
+    pygame.display.init()
+    pygame.display.set_mode((1, 1), pygame.HIDDEN if hasattr(pygame, "HIDDEN") else 0)
+    atlas = TextureAtlas.from_folder(args.texturepack, Settings())
+    if args.output is not None:
+        path = args.output
+    else: # Neben den zwischengespeicherten Texturen, nicht im Arbeitsverzeichnis (siehe .gitignore)
+        directory = os.path.join(TEXTURES_DIRECTORY, args.texturepack, TEXTURE_CACHE)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, ATLAS_NAME)
+    atlas.save(path)
+    print(f"{path}.png: {atlas.surface.get_width()}x{atlas.surface.get_height()}, {len(atlas.rects)} Texturen")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""
+Autopilot: ein Controller, der die Schlange ohne Eingaben spielt (Demo, Dauertests).
+
+Grundlage ist ein Hamiltonkreis, der jedes Feld genau einmal besucht. Folgt die Schlange nur dem Kreis,
+kann sie nie sterben. Um schneller zum Apfel zu kommen, nimmt sie Abkürzungen über Nachbarfelder, aber
+nur so weit, dass der Kopf auf dem Kreis weder den Apfel noch das eigene Schwanzende überholt. Dann
+liegt der Körper immer in Kreisreihenfolge hinter dem Kopf und der Kreis bleibt frei.
+
+Unter den erlaubten Feldern wird das gewählt, das laut einer Breitensuche vom Apfel aus am nächsten
+liegt. Die Breitensuche wird pro Apfel einmal begonnen und bei jedem Aufruf nur um höchstens
+BFS_BUDGET Felder fortgesetzt, bis die Nachbarn des Kopfes erreicht sind; alle Puffer werden wiederverwendet.
+Solange der Apfel weiter als BFS_RADIUS Felder entfernt ist, wird gar nicht gesucht.
+
+Kreise werden pro Spielfeldgröße nur einmal berechnet (hamiltonian_cycle). Für Spielfelder, bei denen
+beide Seiten ungerade sind, gibt es keinen solchen Kreis; dort läuft die Schlange nur zum Apfel, ohne
+zu sterben, solange es geht.
+"""
+# Standardbibliothek
+from array import array
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+import random
+
+# lokale Module
+from engine import Engine, DELTAS, BODY, HEAD, ATE, opposite
+
+ENABLED = False # Mit 'python main.py autopilot' steuert der Autopilot die Schlange im Spiel
+BFS_BUDGET = 64 # Felder, um die die Breitensuche pro Aufruf höchstens fortgesetzt wird
+BFS_RADIUS = 32 # Ist der Apfel weiter entfernt, entscheidet nur die Entfernung entlang des Kreises
+UNKNOWN = 1 << 30 # Entfernung eines Feldes, das die Breitensuche (noch) nicht erreicht hat
+
+class HamiltonianCycle:
+    """Ein Kreis durch alle Felder: 'cells' in Kreisreihenfolge, 'position' gibt zu jedem Feldindex die Stelle im Kreis"""
+    def __init__(self, size: Tuple[int, int], cells: List[Tuple[int, int]]):
+        self.size = tuple(size)
+        self.cells = cells
+        self.position = array("i", [0]) * len(cells)
+        width = size[0]
+        for index, (x, y) in enumerate(cells):
+            self.position[y * width + x] = index
+
+    def __len__(self) -> int:
+        return len(self.cells)
+
+_cycles: Dict[Tuple[int, int], Optional[HamiltonianCycle]] = {}
+
+def cycle_cells(width: int, height: int) -> List[Tuple[int, int]]:
+    """
+    Gibt einen Kreis durch alle Felder eines Spielfelds mit gerader Höhe zurück: Zeile 0 nach rechts, dann
+    in Schlangenlinien durch die Spalten 1 bis Breite-1 nach unten und über Spalte 0 zurück nach oben
+    """
+    cells = [(x, 0) for x in range(width)]
+    for y in range(1, height):
+        columns = range(width - 1, 0, -1) if y % 2 == 1 else range(1, width)
+        cells.extend((x, y) for x in columns)
+    cells.extend((0, y) for y in range(height - 1, 0, -1))
+    return cells
+
+def hamiltonian_cycle(size: Tuple[int, int]) -> Optional[HamiltonianCycle]:
+    """Gibt den (zwischengespeicherten) Kreis für ein Spielfeld zurück oder None, falls es keinen gibt"""
+    size = tuple(size)
+    if size not in _cycles:
+        width, height = size
+        if width < 2 or height < 2 or (width % 2 == 1 and height % 2 == 1):
+            _cycles[size] = None
+        elif height % 2 == 0:
+            _cycles[size] = HamiltonianCycle(size, cycle_cells(width, height))
+        else: # Breite gerade: derselbe Kreis mit vertauschten Achsen
+            _cycles[size] = HamiltonianCycle(size, [(y, x) for x, y in cycle_cells(height, width)])
+    return _cycles[size]
+
+class HamiltonianController:
+    """
+    Wird wie die Controller in simulate.py mit einem Startwert erzeugt und pro Spielschritt mit der
+    Engine aufgerufen; gibt eine Richtung zurück (oder None, falls jede Richtung tödlich ist)
+    """
+    def __init__(self, seed=None, bfs_budget: int = BFS_BUDGET):
+        self.rng = random.Random(seed)
+        self.bfs_budget = bfs_budget
+        self.size = None
+        self.cycle = None
+        self.reverse = False # Wahr, wenn der Kreis rückwärts durchlaufen wird (nach einem Kopftausch)
+        self._tick = None # Engine.ticks beim letzten Aufruf
+
+        # Breitensuche vom Apfel aus. Ein Feld gilt nur als besucht, wenn sein Eintrag in 'stamp' der
+        # aktuellen 'generation' entspricht, so müssen die Puffer für einen neuen Apfel nicht geleert werden
+        self.target = None
+        self.generation = 0
+        self.stamp = array("I")
+        self.distance = array("i")
+        self.frontier = deque()
+
+    def prepare(self, engine: Engine) -> None:
+        """Holt den Kreis und legt die Puffer an, wenn sich die Spielfeldgröße geändert hat"""
+        size = (engine.width, engine.height)
+        if size == self.size:
+            return
+        self.size = size
+        self.cycle = hamiltonian_cycle(size)
+        cells = size[0] * size[1]
+        self.stamp = array("I", [0]) * cells
+        self.distance = array("i", [0]) * cells
+        self.frontier.clear()
+        self.target = None
+        self.generation = 0
+
+    def orient(self, engine: Engine) -> None:
+        """Beim Kopftausch dreht sich der Körper um, ab dann wird der Kreis in der anderen Richtung durchlaufen"""
+        if engine.ticks == 0 or self._tick is None or engine.ticks < self._tick: # neues Spiel
+            self.reverse = False
+        elif engine.ticks != self._tick and engine.switch_heads and engine.status == ATE:
+            self.reverse = not self.reverse
+        self._tick = engine.ticks
+
+    def search(self, engine: Engine, needed: List[int]) -> None:
+        """Setzt die Breitensuche vom Apfel aus fort, bis alle Felder in 'needed' erreicht sind"""
+        width, height = self.size
+        stamp, distance, frontier = self.stamp, self.distance, self.frontier
+        apple = engine.apple[1] * width + engine.apple[0]
+        if self.target != apple: # neuer Apfel, neue Suche
+            self.target = apple
+            self.generation += 1
+            if self.generation >= 1 << 32:
+                self.stamp = stamp = array("I", [0]) * (width * height)
+                self.generation = 1
+            frontier.clear()
+            frontier.append(apple)
+            stamp[apple] = self.generation
+            distance[apple] = 0
+
+        generation = self.generation
+        grid = engine.grid
+        wrap = engine.wrap
+        budget = self.bfs_budget
+        while frontier and budget > 0 and any(stamp[index] != generation for index in needed):
+            for _ in range(min(budget, len(frontier))):
+                index = frontier.popleft()
+                y, x = divmod(index, width)
+                following = distance[index] + 1
+                for dx, dy in DELTAS:
+                    nx, ny = x + dx, y + dy
+                    if wrap:
+                        nx %= width
+                        ny %= height
+                    elif not (0 <= nx < width and 0 <= ny < height):
+                        continue
+                    neighbour = ny * width + nx
+                    if stamp[neighbour] == generation:
+                        continue
+                    stamp[neighbour] = generation
+                    distance[neighbour] = following
+                    if grid[neighbour] != BODY and grid[neighbour] != HEAD:
+                        frontier.append(neighbour)
+                    else:
+                        distance[neighbour] = UNKNOWN # Hindernis
+                budget -= 1
+
+    def __call__(self, engine: Engine) -> Optional[int]:
+        if engine.over or engine.apple is None:
+            return None
+        self.prepare(engine)
+        self.orient(engine)
+        width, height = self.size
+        grid = engine.grid
+        head = engine.body[0]
+        tail = engine.body[-1]
+
+        # Mögliche Züge: Richtung, Feldindex
+        moves = []
+        for direction in range(4):
+            if direction == opposite(engine.last_direction):
+                continue
+            x, y = head[0] + DELTAS[direction][0], head[1] + DELTAS[direction][1]
+            if engine.wrap:
+                x %= width
+                y %= height
+            elif not (0 <= x < width and 0 <= y < height):
+                continue
+            index = y * width + x
+            if (grid[index] == BODY or grid[index] == HEAD) and (x, y) != tail:
+                continue
+            moves.append((direction, index))
+        if not moves:
+            return None
+
+        dx = abs(head[0] - engine.apple[0])
+        dy = abs(head[1] - engine.apple[1])
+        if engine.wrap:
+            dx = min(dx, width - dx)
+            dy = min(dy, height - dy)
+        if dx + dy <= BFS_RADIUS:
+            self.search(engine, [index for _, index in moves])
+        # Ohne Suche für diesen Apfel gelten alle Felder als unbekannt
+        stamp, distance = self.stamp, self.distance
+        generation = self.generation if self.target == engine.apple[1] * width + engine.apple[0] else -1
+        def apple_distance(index: int) -> int:
+            return distance[index] if stamp[index] == generation else UNKNOWN
+
+        if self.cycle is None: # kein Kreis möglich, nur zum Apfel laufen
+            return min(moves, key=lambda move: (apple_distance(move[1]), self.rng.random()))[0]
+
+        # Entfernungen entlang des Kreises in Laufrichtung
+        position = self.cycle.position
+        length = len(self.cycle)
+        sign = -1 if self.reverse else 1
+        start = position[head[1] * width + head[0]]
+        def ahead(index: int) -> int:
+            return (sign * (position[index] - start)) % length
+
+        to_apple = ahead(engine.apple[1] * width + engine.apple[0])
+        to_tail = ahead(tail[1] * width + tail[0]) if len(engine.body) > 1 else length
+
+        best = None
+        best_key = None
+        for direction, index in moves:
+            steps = ahead(index)
+            # Das nächste Feld auf dem Kreis ist immer sicher. Eine Abkürzung darf weder den Apfel noch
+            # das Schwanzende überspringen, sonst liegt der Körper nicht mehr hinter dem Kopf
+            if steps != 1 and not (steps <= to_apple and steps < to_tail):
+                continue
+            key = (apple_distance(index), to_apple - steps)
+            if best_key is None or key < best_key:
+                best, best_key = direction, key
+        if best is None: # Der Körper liegt nicht auf dem Kreis (z.B. vorher selbst gesteuert)
+            best = min(moves, key=lambda move: (apple_distance(move[1]), self.rng.random()))[0]
+        return best
@@ -0,0 +1,262 @@
+"""
+Vektorisierte Variante der Engine: N unabhängige Spiele werden mit NumPy gleichzeitig berechnet.
+
+Die Regeln entsprechen denen aus engine.py, alle Felder werden aber als Feldnummer
+(y * Breite + x) gespeichert und jeder Zustand liegt als Array mit einer Zeile pro Spiel vor.
+"""
+# Standardbibliothek
+from typing import List, Optional, Tuple
+
+# externe Bibliothek
+import numpy as np
+
+# lokale Module
+from engine import UP, RIGHT, DOWN, LEFT, DELTAS, MOVED, ATE, DIED, WON, EMPTY, BODY, HEAD, APPLE, Cell
+
+_DX = np.array([delta[0] for delta in DELTAS], dtype=np.int32)
+_DY = np.array([delta[1] for delta in DELTAS], dtype=np.int32)
+
+class BatchEngine:
+    """
+    Regeln des normalen Spielmodus für 'count' Spiele gleichzeitig.
+
+    Jede Schlange liegt in einem Ringpuffer ('body') mit Platz für das ganze Spielfeld.
+    'start' zeigt auf das vordere Ende, 'length' ist die Länge der Schlange. Ist 'flipped' gesetzt,
+    ist das hintere Ende der Kopf; so kann der Kopftausch die Schlange in O(1) umdrehen.
+    Die freien Felder werden wie in engine.FreeCells dicht in 'free_cells' gehalten.
+    """
+    wrap = False # Wahr, wenn die Schlange am Spielfeldrand auf der anderen Seite herauskommt
+    switch_heads = False # Wahr, wenn Kopf und Schwanzende nach jedem Apfel getauscht werden
+
+    def __init__(self, size: Tuple[int, int], count: int, seed=None):
+        self.width, self.height = size
+        self.count = count
+        cells = self.width * self.height
+
+        self.grid = np.zeros((count, cells), dtype=np.uint8) # Belegungsraster (EMPTY, BODY, HEAD, APPLE)
+        self.body = np.zeros((count, cells), dtype=np.int32)
+        self.start = np.zeros(count, dtype=np.int32)
+        self.length = np.zeros(count, dtype=np.int32)
+        self.flipped = np.zeros(count, dtype=bool)
+        self.direction = np.zeros(count, dtype=np.int8)
+        self.last_direction = np.zeros(count, dtype=np.int8)
+        self.apple = np.zeros(count, dtype=np.int32)
+        self.status = np.zeros(count, dtype=np.int8)
+        self.ticks = np.zeros(count, dtype=np.int64)
+
+        self.free_cells = np.zeros((count, cells), dtype=np.int32)
+        self.free_positions = np.zeros((count, cells), dtype=np.int32)
+        self.free_count = np.zeros(count, dtype=np.int32)
+
+        self._rows = np.arange(count)
+        self._cells = np.arange(cells, dtype=np.int32)
+        self.rng = np.random.default_rng()
+        self.reset(seed)
+
+    def reset(self, seed=None, rows: Optional[np.ndarray] = None) -> None:
+        """
+        Setzt die Spiele in 'rows' (Standard: alle) auf den Anfangszustand zurück.
+        Ein 'seed' initialisiert den Zufallsgenerator aller Spiele neu
+        """
+        if seed is not None or rows is None:
+            self.rng = np.random.default_rng(seed)
+        rows = self._rows if rows is None else np.asarray(rows)
+        if rows.dtype == bool:
+            rows = np.flatnonzero(rows)
+        if len(rows) == 0:
+            return
+
+        self.grid[rows] = EMPTY
+        self.body[rows, 0] = 0 # Die Schlange startet oben links
+        self.start[rows] = 0
+        self.length[rows] = 1
+        self.flipped[rows] = False
+        self.direction[rows] = RIGHT
+        self.last_direction[rows] = RIGHT
+        self.status[rows] = MOVED
+        self.ticks[rows] = 0
+
+        self.free_cells[rows] = self._cells
+        self.free_positions[rows] = self._cells
+        self.free_count[rows] = self.width * self.height
+        head = np.zeros(len(rows), dtype=np.int32)
+        self._occupy(rows, head)
+        self.grid[rows, 0] = HEAD
+        self._spawn_apples(rows)
+
+    @property
+    def over(self) -> np.ndarray:
+        return (self.status == DIED) | (self.status == WON)
+
+    @property
+    def score(self) -> np.ndarray:
+        return self.length - 1
+
+    @property
+    def heads(self) -> np.ndarray:
+        """Feldnummern der Köpfe"""
+        return self.body[self._rows, self._head_slots(self._rows)]
+
+    def _head_slots(self, rows: np.ndarray) -> np.ndarray:
+        capacity = self.body.shape[1]
+        back = (self.start[rows] + self.length[rows] - 1) % capacity
+        return np.where(self.flipped[rows], back, self.start[rows])
+
+    def _tail_slots(self, rows: np.ndarray) -> np.ndarray:
+        capacity = self.body.shape[1]
+        back = (self.start[rows] + self.length[rows] - 1) % capacity
+        return np.where(self.flipped[rows], self.start[rows], back)
+
+    def _occupy(self, rows: np.ndarray, cells: np.ndarray) -> None:
+        """Entfernt je ein Feld pro Spiel aus den freien Feldern (jede Zeile darf nur einmal vorkommen)"""
+        positions = self.free_positions[rows, cells]
+        self.free_count[rows] -= 1
+        last_positions = self.free_count[rows]
+        last = self.free_cells[rows, last_positions]
+        self.free_cells[rows, positions] = last
+        self.free_positions[rows, last] = positions
+        self.free_cells[rows, last_positions] = cells
+        self.free_positions[rows, cells] = last_positions
+
+    def _release(self, rows: np.ndarray, cells: np.ndarray) -> None:
+        """Fügt je ein Feld pro Spiel wieder zu den freien Feldern hinzu"""
+        positions = self.free_positions[rows, cells]
+        first_positions = self.free_count[rows]
+        first = self.free_cells[rows, first_positions] # erstes belegtes Feld
+        self.free_cells[rows, positions] = first
+        self.free_positions[rows, first] = positions
+        self.free_cells[rows, first_positions] = cells
+        self.free_positions[rows, cells] = first_positions
+        self.free_count[rows] += 1
+
+    def _spawn_apples(self, rows: np.ndarray) -> None:
+        """Legt in jedem Spiel aus 'rows' einen Apfel auf ein zufälliges freies Feld"""
+        picks = (self.rng.random(len(rows)) * self.free_count[rows]).astype(np.int32)
+        apples = self.free_cells[rows, picks]
+        self.apple[rows] = apples
+        self.grid[rows, apples] = APPLE
+
+    def _push_head(self, rows: np.ndarray, cells: np.ndarray, grow: bool) -> None:
+        """Fügt den neuen Kopf am Kopfende des Ringpuffers an; ohne 'grow' fällt das Ende weg"""
+        capacity = self.body.shape[1]
+        flipped = self.flipped[rows]
+        front = np.where(flipped, self.start[rows], (self.start[rows] - 1) % capacity)
+        slots = np.where(flipped, (self.start[rows] + self.length[rows]) % capacity, front)
+        self.body[rows, slots] = cells
+        if grow:
+            self.start[rows] = front
+            self.length[rows] += 1
+        else:
+            self.start[rows] = np.where(flipped, (self.start[rows] + 1) % capacity, front)
+
+    def step(self, actions: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Führt in allen laufenden Spielen einen Schritt aus. 'actions' enthält pro Spiel eine Richtung
+        oder -1 für "Richtung beibehalten". Gibt das Array mit MOVED, ATE, DIED oder WON zurück
+        """
+        rows = np.flatnonzero(~self.over)
+        if len(rows) == 0:
+            return self.status
+
+        if actions is not None:
+            actions = np.asarray(actions)[rows]
+            valid = (actions >= 0) & (actions != (self.last_direction[rows] + 2) % 4)
+            self.direction[rows] = np.where(valid, actions, self.direction[rows])
+        self.ticks[rows] += 1
+
+        direction = self.direction[rows]
+        heads = self.body[rows, self._head_slots(rows)]
+        x = heads % self.width + _DX[direction]
+        y = heads // self.width + _DY[direction]
+        if self.wrap:
+            x %= self.width
+            y %= self.height
+            inside = np.ones(len(rows), dtype=bool)
+        else:
+            inside = (x >= 0) & (x < self.width) & (y >= 0) & (y < self.height)
+        cells = np.where(inside, y * self.width + x, 0)
+
+        content = self.grid[rows, cells]
+        tails = self.body[rows, self._tail_slots(rows)]
+        # Das Ende der Schlange gibt sein Feld frei, bevor der Kopf es betritt
+        died = ~inside | ((content == BODY) & (cells != tails))
+        ate = ~died & (content == APPLE)
+        moved = ~died & ~ate
+
+        self.status[rows[died]] = DIED
+
+        # Bewegung ohne Apfel
+        m_rows, m_cells, m_heads, m_tails = rows[moved], cells[moved], heads[moved], tails[moved]
+        self.grid[m_rows, m_heads] = BODY
+        self.grid[m_rows, m_tails] = EMPTY
+        self._release(m_rows, m_tails)
+        self._push_head(m_rows, m_cells, grow=False)
+        self.grid[m_rows, m_cells] = HEAD
+        self._occupy(m_rows, m_cells)
+        self.last_direction[m_rows] = self.direction[m_rows]
+        self.status[m_rows] = MOVED
+
+        # Apfel gegessen: die Schlange wächst, das Ende bleibt stehen
+        a_rows, a_cells = rows[ate], cells[ate]
+        self.grid[a_rows, heads[ate]] = BODY
+        self._push_head(a_rows, a_cells, grow=True)
+        self.grid[a_rows, a_cells] = HEAD
+        self._occupy(a_rows, a_cells)
+        self.last_direction[a_rows] = self.direction[a_rows]
+
+        full = self.free_count[a_rows] == 0
+        self.status[a_rows[full]] = WON # Spiel ist zu ende, der Spieler hat gewonnen
+        a_rows = a_rows[~full]
+        self.status[a_rows] = ATE
+        self._spawn_apples(a_rows)
+        self.eaten(a_rows)
+        return self.status
+
+    def eaten(self, rows: np.ndarray) -> None:
+        """Wird für die Spiele aufgerufen, in denen die Schlange gewachsen ist und ein neuer Apfel liegt"""
+        pass
+
+    def cells(self, row: int) -> List[Cell]:
+        """Gibt die Felder der Schlange eines Spiels zurück, beginnend mit dem Kopf"""
+        capacity = self.body.shape[1]
+        slots = (self.start[row] + np.arange(self.length[row])) % capacity
+        body = self.body[row, slots]
+        if self.flipped[row]:
+            body = body[::-1]
+        return [(int(cell % self.width), int(cell // self.width)) for cell in body]
+
+class HeadSwitchBatchEngine(BatchEngine):
+    """Kopftausch: Nach jedem Apfel werden Kopf und Schwanzende vertauscht"""
+    switch_heads = True
+
+    def eaten(self, rows: np.ndarray) -> None:
+        old_heads = self.body[rows, self._head_slots(rows)]
+        self.flipped[rows] = ~self.flipped[rows]
+        capacity = self.body.shape[1]
+        heads = self.body[rows, self._head_slots(rows)]
+        # Der Hals liegt vom neuen Kopf aus gesehen eins weiter zur Mitte der Schlange
+        neck_slots = np.where(self.flipped[rows], self._head_slots(rows) - 1, self._head_slots(rows) + 1) % capacity
+        necks = self.body[rows, neck_slots]
+        self.grid[rows, old_heads] = BODY
+        self.grid[rows, heads] = HEAD
+
+        # Die neue Richtung zeigt vom neuen Hals weg zum neuen Kopf
+        dx = heads % self.width - necks % self.width
+        dy = heads // self.width - necks // self.width
+        direction = np.where(dx == 1, RIGHT, np.where(dx == -1, LEFT, np.where(dy == 1, DOWN, UP)))
+        self.direction[rows] = direction
+        self.last_direction[rows] = direction
+
+class WithoutWallBatchEngine(BatchEngine):
+    """Wandlos: Am Spielfeldrand kommt die Schlange auf der gegenüberliegenden Seite heraus"""
+    wrap = True
+
+def batch_engine_class(engine_class: type) -> type:
+    """Gibt die BatchEngine mit denselben Regeln wie eine Engine-Klasse aus engine.py zurück"""
+    if engine_class.wrap and engine_class.switch_heads:
+        raise ValueError(f"keine BatchEngine für {engine_class.__name__} (Wandlos und Kopftausch)")
+    if engine_class.wrap:
+        return WithoutWallBatchEngine
+    if engine_class.switch_heads:
+        return HeadSwitchBatchEngine
+    return BatchEngine
@@ -0,0 +1,318 @@
+"""
+Benchmarks für die Spiellogik und die Darstellung, laufen auch ohne Bildschirm (SDL_VIDEODRIVER=dummy).
+
+    python main.py benchmark run --output baseline.json
+    python main.py benchmark compare baseline.json --threshold 10
+
+'run' misst alle Kombinationen aus Spielmodus, Spielfeldgröße und Schlangenlänge und schreibt die
+Ergebnisse als JSON. 'compare' vergleicht eine gespeicherte Messung mit einer neuen (oder einer zweiten
+Datei) und endet mit Exit-Code 1, falls etwas um mehr als 'threshold' Prozent langsamer geworden ist.
+
+Die Schlange wird für die Messungen entlang eines Hamiltonkreises gelegt und bewegt, so stirbt sie nie
+und jede Länge bis zur Größe des Spielfelds ist möglich.
+"""
+# Standardbibliothek
+from collections import deque
+from types import SimpleNamespace
+from typing import Callable, List, Optional, Tuple
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+# lokale Module
+from autopilot import cycle_cells
+from engine import DELTAS
+
+SIZES = (20, 100, 1000)
+LENGTHS = (1, 10, 100, 1000)
+MODES = ("Normal", "Kopftausch", "Wandlos")
+TILESIZE = 10
+MAX_PIXELS = 4096 * 4096 # Größere Spielfelder werden nur als Ausschnitt gezeichnet (siehe viewport.py)
+VIEWPORT = (64, 48)
+BATCH_CELLS = 1 << 20 # Felder aller Spiele einer BatchEngine zusammen
+MIN_TIME = 0.2 # Sekunden pro Messung
+REPEAT = 3
+
+def direction_between(a: Tuple[int, int], b: Tuple[int, int], size: Tuple[int, int]) -> int:
+    """Richtung von Feld a zum benachbarten Feld b"""
+    delta = ((b[0] - a[0] + 1) % size[0] - 1, (b[1] - a[1] + 1) % size[1] - 1)
+    return DELTAS.index(delta)
+
+def measure(function: Callable[[], object], min_time: float = MIN_TIME, repeat: int = REPEAT) -> float:
+    """Gibt die kürzeste Zeit pro Aufruf in Sekunden zurück (beste von 'repeat' Durchläufen)"""
+    perf_counter = time.perf_counter
+    number = 1
+    while True: # Anzahl der Aufrufe so wählen, dass ein Durchlauf etwa min_time / repeat dauert
+        start = perf_counter()
+        for _ in range(number):
+            function()
+        elapsed = perf_counter() - start
+        if elapsed >= min_time / repeat / 4 or number >= 1 << 20:
+            break
+        number *= 4
+    number = max(1, int(number * (min_time / repeat) / max(elapsed, 1e-9)))
+    best = elapsed / max(1, number)
+    for _ in range(repeat):
+        start = perf_counter()
+        for _ in range(number):
+            function()
+        best = min(best, (perf_counter() - start) / number)
+    return best
+
+class Setup:
+    """Ein Spiel in einem bestimmten Zustand: Modus, Spielfeldgröße, Schlangenlänge"""
+    def __init__(self, mode: str, size: int, length: int, tilesize: int = TILESIZE):
+        from game import Game, HeadSwitch, WithoutWall
+        self.mode = mode
+        self.size = (size, size)
+        self.length = length
+        self.cycle = cycle_cells(*self.size)
+        self.position = length - 1 # Index des Kopfes im Kreis
+
+        # Die Einstellungen liegen in einer eigenen Datei, weil Game sie mit Settings.copy neu lädt
+        with open("gameconfig.json", "r") as file:
+            content = json.load(file)
+        content.update(size=list(self.size), tilesize=[tilesize, tilesize], gamemode=mode)
+        if size * tilesize * size * tilesize > MAX_PIXELS:
+            content["viewport"] = list(VIEWPORT)
+        else:
+            content.pop("viewport", None)
+        descriptor, self.config_path = tempfile.mkstemp(prefix="snake_benchmark", suffix=".json")
+        with os.fdopen(descriptor, "w") as file:
+            json.dump(content, file)
+
+        from settings import Settings
+        self.settings = Settings(self.config_path)
+        gameclass = {"Normal": Game, "Kopftausch": HeadSwitch, "Wandlos": WithoutWall}[mode]
+        self.game = gameclass(self.settings, config={"speed_increase": 0})
+        self.settings = self.game.settings
+        self.place_snake()
+
+    def close(self) -> None:
+        os.remove(self.config_path)
+
+    def body(self) -> List[Tuple[int, int]]:
+        """Felder der Schlange ab dem Kopf"""
+        return [self.cycle[(self.position - index) % len(self.cycle)] for index in range(self.length)]
+
+    def place_snake(self) -> None:
+        """Legt Engine und Sprites auf die Schlange entlang des Kreises"""
+        from sprites import Direction, Tail
+        game = self.game
+        body = self.body()
+        head_direction = direction_between(body[1], body[0], self.size) if len(body) > 1 else 1
+        apple = self.cycle[(self.position + 1) % len(self.cycle)] if self.length < len(self.cycle) else body[-1]
+        game.engine.restore(body, apple, head_direction, head_direction, 0)
+
+        snake = game.snake
+        snake.reset()
+        snake.rect.topleft = game.to_pixels(body[0])
+        snake.direction = snake._lastdirection = Direction.from_index(head_direction)
+        for cell in body[1:]:
+            tail = snake.pool.pop() if snake.pool else Tail((0, 0), game.texturepack)
+            tail.rect.topleft = game.to_pixels(cell)
+            snake.tails.append(tail)
+            game.tails.add(tail)
+            game.all_entities.add(tail)
+        snake.texture(self.settings if game.engine.wrap else None, True)
+        game.apple.rect.topleft = game.to_pixels(apple)
+        if game.camera is not None:
+            game.camera.center(body[0])
+        game.dirty_sprites.clear()
+        game.dirty_rects.clear()
+
+    def fake_engine(self):
+        """Gibt einen Ersatz für die Engine zurück, dessen Schlange sich bei jedem advance() einen Schritt bewegt"""
+        engine = SimpleNamespace(body=deque(self.body()), direction=self.game.engine.direction)
+        cycle = self.cycle
+
+        def advance():
+            self.position = (self.position + 1) % len(cycle)
+            cell = cycle[self.position]
+            engine.direction = direction_between(engine.body[0], cell, self.size)
+            engine.body.appendleft(cell)
+            engine.body.pop()
+        return engine, advance
+
+def run_benchmarks(sizes=SIZES, lengths=LENGTHS, modes=MODES, tilesize: int = TILESIZE,
+                   min_time: float = MIN_TIME, log=print) -> List[dict]:
+    import numpy as np
+    from batch import batch_engine_class
+    from game import get_apple_position
+    from simulate import GreedyController
+    from sprites import Direction
+    results = []
+
+    def add(name: str, seconds: float, mode: Optional[str] = None, size: Optional[int] = None,
+            length: Optional[int] = None) -> None:
+        result = {"name": name, "mode": mode, "size": size, "length": length,
+                  "ms": seconds * 1000, "per_second": 1 / seconds if seconds > 0 else None}
+        results.append(result)
+        log(f"{name:<36} {mode or '-':<10} {size or '-':>5} {length or '-':>5} {seconds * 1000:10.4f} ms")
+
+    for mode in modes:
+        for size in sizes:
+            for length in lengths:
+                if length > size * size // 2:
+                    continue
+                setup = Setup(mode, size, length, tilesize)
+                game, settings = setup.game, setup.settings
+                wrap_settings = settings if game.engine.wrap else None
+                try:
+                    # Apfel auf ein zufälliges freies Feld
+                    old_apple = game.apple.rect.topleft
+                    add("get_apple_position", measure(lambda: get_apple_position(game.engine, settings, old_apple),
+                                                      min_time), mode, size, length)
+
+                    # Ein Schritt der Darstellung (O(1) pro Schritt)
+                    engine, advance = setup.fake_engine()
+                    def update():
+                        advance()
+                        game.snake.update(engine, False, wrap_settings)
+                        game.dirty_sprites.clear()
+                        game.dirty_rects.clear()
+                    add("SnakeHead.update", measure(update, min_time), mode, size, length)
+
+                    # Vollständiges Neuberechnen der Texturen (z.B. beim Kopftausch)
+                    setup.place_snake()
+                    add("SnakeHead.texture(full)", measure(lambda: game.snake.texture(wrap_settings, True), min_time),
+                        mode, size, length)
+
+                    # Ganzes Bild
+                    add("Game.draw", measure(game.draw, min_time), mode, size, length)
+                finally:
+                    setup.close()
+
+            # Spielschritte eines echten Spiels (Engine, Wiederholung, Sprites), Länge ergibt sich aus dem Spiel
+            setup = Setup(mode, size, 1, tilesize)
+            try:
+                game = setup.game
+                game.dead = game.win = lambda: None
+                controller = GreedyController(1)
+                elapsed = ticks = 0
+                deadline = time.perf_counter() + min_time
+                while time.perf_counter() < deadline:
+                    if game.engine.over:
+                        game.reset()
+                    direction = controller(game.engine)
+                    if direction is not None:
+                        game.snake.direction = Direction.from_index(direction)
+                    start = time.perf_counter()
+                    game.apple_logic()
+                    game.snake_logic()
+                    elapsed += time.perf_counter() - start
+                    ticks += 1
+                    game.dirty_sprites.clear()
+                    game.dirty_rects.clear()
+                add("Game tick", elapsed / max(ticks, 1), mode, size)
+            finally:
+                setup.close()
+
+            # Vektorisierte Spielschritte vieler Spiele gleichzeitig (Zeit pro Spiel und Schritt)
+            games = max(1, BATCH_CELLS // (size * size))
+            batch = batch_engine_class(game.engine_class)((size, size), games, seed=1)
+            rng = np.random.default_rng(1)
+            def batch_step():
+                batch.step(rng.integers(0, 4, games))
+                batch.reset(rows=batch.over)
+            add("BatchEngine.step(per game)", measure(batch_step, min_time) / games, mode, size)
+
+    # Unabhängig von Modus und Schlange
+    for size in sizes:
+        if size * tilesize * size * tilesize > MAX_PIXELS:
+            continue
+        setup = Setup("Normal", size, 1, tilesize)
+        try:
+            texturepack = setup.game.texturepack
+            add("TexturePack._default_drawbackground", measure(texturepack._default_drawbackground, min_time),
+                size=size)
+            if size == sizes[0]:
+                body = texturepack._textures["SNAKEBODY"]
+                add("TexturePack.create_edges", measure(lambda: texturepack.create_edges(body.copy()), min_time))
+        finally:
+            setup.close()
+    return results
+
+def environment() -> dict:
+    import pygame
+    return {"date": datetime.datetime.now().isoformat(timespec="seconds"), "python": platform.python_version(),
+            "pygame": pygame.version.ver, "platform": platform.platform(),
+            "video_driver": os.environ.get("SDL_VIDEODRIVER")}
+
+def key(result: dict) -> tuple:
+    return result["name"], result["mode"], result["size"], result["length"]
+
+def compare(baseline: dict, current: dict, threshold: float) -> List[dict]:
+    """Gibt die Messungen zurück, die um mehr als 'threshold' Prozent langsamer geworden sind"""
+    old = {key(result): result for result in baseline["results"]}
+    regressions = []
+    print(f"{'Messung':<36} {'Modus':<10} {'Größe':>5} {'Länge':>5} {'vorher':>10} {'jetzt':>10} {'Änderung':>9}")
+    for result in current["results"]:
+        before = old.get(key(result))
+        if before is None:
+            continue
+        change = (result["ms"] / before["ms"] - 1) * 100 if before["ms"] > 0 else 0.0
+        flag = " <- langsamer" if change > threshold else ""
+        print(f"{result['name']:<36} {result['mode'] or '-':<10} {result['size'] or '-':>5} "
+              f"{result['length'] or '-':>5} {before['ms']:10.4f} {result['ms']:10.4f} {change:+8.1f}%{flag}")
+        if flag:
+            regressions.append(dict(result, baseline_ms=before["ms"], change=change))
+    return regressions
+
+def _numbers(text: str) -> List[int]:
+    return [int(value) for value in text.split(",") if value.strip()]
+
+def main(args=None) -> None:
+    parser = argparse.ArgumentParser(prog="main.py benchmark", description="Benchmarks ohne Bildschirm")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Misst und schreibt die Ergebnisse als JSON")
+    compare_parser = commands.add_parser("compare", help="Vergleicht mit einer gespeicherten Messung")
+    for command in (run_parser, compare_parser):
+        command.add_argument("--sizes", type=_numbers, default=list(SIZES), help="Spielfeldgrößen, z.B. 20,100")
+        command.add_argument("--lengths", type=_numbers, default=list(LENGTHS), help="Schlangenlängen, z.B. 1,100")
+        command.add_argument("--modes", type=lambda text: text.split(","), default=list(MODES), help="Spielmodi")
+        command.add_argument("--tilesize", type=int, default=TILESIZE, help="Feldgröße in Pixeln")
+        command.add_argument("--min-time", type=float, default=MIN_TIME, help="Sekunden pro Messung")
+    run_parser.add_argument("--output", default=None, help="JSON-Datei (Standard: Ausgabe auf der Konsole)")
+    compare_parser.add_argument("baseline", help="gespeicherte Messung")
+    compare_parser.add_argument("current", nargs="?", default=None, help="zweite Messung statt einer neuen")
+    compare_parser.add_argument("--threshold", type=float, default=10.0, help="erlaubte Verlangsamung in Prozent")
+    args = parser.parse_args(args)
+
+    if args.command == "compare" and args.current is not None:
+        with open(args.current, "r") as file:
+            current = json.load(file)
+    else:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+        import pygame
+        pygame.display.init()
+        pygame.font.init()
+        pygame.display.set_mode((1, 1))
+        log = print if args.command == "compare" or args.output is not None else (lambda text: print(text, file=sys.stderr))
+        results = run_benchmarks(args.sizes, args.lengths, args.modes, args.tilesize, args.min_time, log)
+        current = {"environment": environment(), "tilesize": args.tilesize, "results": results}
+
+    if args.command == "run":
+        text = json.dumps(current, indent=4)
+        if args.output is None:
+            print(text)
+        else:
+            with open(args.output, "w") as file:
+                file.write(text)
+        return
+
+    with open(args.baseline, "r") as file:
+        baseline = json.load(file)
+    regressions = compare(baseline, current, args.threshold)
+    print(f"{len(regressions)} Messungen sind um mehr als {args.threshold:g}% langsamer")
+    sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
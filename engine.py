@@ -0,0 +1,273 @@
+"""
+Grafikfreie Spiellogik für die eingebauten Spielmodi.
+
+Die Engine arbeitet ausschließlich mit Feldkoordinaten (x, y) und ganzzahligen Richtungen,
+sie braucht also weder pygame noch ein Fenster. Die Klassen in game.py stellen den Zustand
+der Engine nur noch dar.
+"""
+# Standardbibliothek
+from array import array
+from typing import Deque, Optional, Tuple
+from collections import deque
+import random
+
+# Richtungen (die Reihenfolge entspricht der von sprites.Direction)
+UP, RIGHT, DOWN, LEFT = range(4)
+DELTAS = ((0, -1), (1, 0), (0, 1), (-1, 0)) # Verschiebung pro Richtung
+
+# Ergebnisse eines Spielschritts
+MOVED, ATE, DIED, WON = range(4)
+
+# Inhalt eines Feldes im Belegungsraster 'Engine.grid'
+EMPTY, BODY, HEAD, APPLE = range(4)
+
+Cell = Tuple[int, int]
+
+def opposite(direction: int) -> int:
+    """Gibt die entgegengesetzte Richtung zurück"""
+    return (direction + 2) % 4
+
+class FreeCells:
+    """
+    Menge der freien Felder. Die freien Feldnummern (y * Breite + x) stehen dicht am Anfang
+    von 'cells', 'positions' merkt sich, wo ein Feld darin steht. Beim Entfernen wird das Feld mit
+    dem letzten freien Feld vertauscht, sodass Hinzufügen, Entfernen und Ziehen O(1) sind.
+    Beide liegen in array('i') mit 4 Bytes pro Feld, damit auch große Spielfelder wenig Speicher brauchen
+    """
+    def __init__(self, size: Tuple[int, int]):
+        self.width, self.height = size
+        # Vorlage für reset: array('i', range(n)) ist langsam, eine Kopie davon nur ein memcpy
+        self._identity = array("i", range(self.width * self.height))
+        self.reset()
+
+    def reset(self) -> None:
+        """Markiert alle Felder als frei"""
+        self.cells = self._identity[:]
+        self.positions = self._identity[:]
+        self.count = len(self._identity) # Anzahl der freien Felder
+
+    def rebuild(self, grid: bytearray) -> None:
+        """
+        Baut die Menge aus einem Belegungsraster neu auf. Die Reihenfolge hängt danach nur vom Raster ab,
+        nicht davon, wie die Felder frei geworden sind (wichtig für Wiederholungen, siehe replay.py)
+        """
+        self.cells = array("i", (index for index, content in enumerate(grid) if content == EMPTY or content == APPLE))
+        self.count = len(self.cells)
+        self.cells.extend(index for index, content in enumerate(grid) if content == BODY or content == HEAD)
+        positions = self.positions
+        for position, index in enumerate(self.cells):
+            positions[index] = position
+
+    def load(self, cells: array, count: int) -> None:
+        """Übernimmt eine gespeicherte Reihenfolge 'cells' (siehe replay.py), die ersten 'count' Felder sind frei"""
+        self.cells = array("i", cells)
+        self.count = count
+        positions = self.positions
+        for position, index in enumerate(self.cells):
+            positions[index] = position
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, cell: Cell) -> bool:
+        return self.positions[cell[1] * self.width + cell[0]] < self.count
+
+    def remove(self, cell: Cell) -> None:
+        """Markiert ein freies Feld als belegt"""
+        index = cell[1] * self.width + cell[0]
+        position = self.positions[index]
+        self.count -= 1
+        last = self.cells[self.count]
+        # Das letzte freie Feld rückt an die Stelle des entfernten
+        self.cells[position] = last
+        self.positions[last] = position
+        self.cells[self.count] = index
+        self.positions[index] = self.count
+
+    def add(self, cell: Cell) -> None:
+        """Markiert ein belegtes Feld als frei"""
+        index = cell[1] * self.width + cell[0]
+        position = self.positions[index]
+        first = self.cells[self.count] # erstes belegtes Feld
+        self.cells[position] = first
+        self.positions[first] = position
+        self.cells[self.count] = index
+        self.positions[index] = self.count
+        self.count += 1
+
+    def choice(self, rng: random.Random, exclude: Optional[Cell] = None) -> Optional[Cell]:
+        """Gibt ein zufälliges freies Feld außer 'exclude' zurück oder None, falls es keines gibt"""
+        excluded = exclude is not None and exclude in self
+        if excluded:
+            self.remove(exclude)
+        if self.count == 0:
+            cell = None
+        else:
+            y, x = divmod(self.cells[rng.randrange(self.count)], self.width)
+            cell = (x, y)
+        if excluded:
+            self.add(exclude)
+        return cell
+
+class Engine:
+    """
+    Regeln des normalen Spielmodus: Die Schlange stirbt an der Wand und an sich selbst.
+    """
+    wrap = False # Wahr, wenn die Schlange am Spielfeldrand auf der anderen Seite herauskommt
+    switch_heads = False # Wahr, wenn Kopf und Schwanzende nach jedem Apfel getauscht werden
+
+    def __init__(self, size: Tuple[int, int], seed=None):
+        self.width, self.height = size
+        self.rng = random.Random()
+        self.free = FreeCells(size)
+        # Belegungsraster, ein Byte pro Feld (Index: y * Breite + x)
+        self.grid = bytearray(self.width * self.height)
+        self.reset(seed)
+
+    def reset(self, seed=None) -> None:
+        """Setzt das Spiel auf den Anfangszustand zurück; die Schlange startet oben links"""
+        self.rng.seed(seed)
+        # Ringpuffer der belegten Felder, body[0] ist der Kopf. Ein Schritt ist "Kopf vorne anfügen,
+        # Ende hinten entfernen", Wachsen nur "Kopf vorne anfügen"
+        self.body: Deque[Cell] = deque(((0, 0),))
+        self.free.reset()
+        self.free.remove((0, 0))
+        self.grid[:] = bytes(len(self.grid))
+        self.grid[0] = HEAD
+        self.direction = RIGHT
+        self.last_direction = RIGHT # Richtung des letzten Schritts, verhindert das Umdrehen
+        self.status = MOVED
+        self.ticks = 0
+        self.apple = None
+        self.apple = self.spawn_apple()
+        self.grid[self.apple[1] * self.width + self.apple[0]] = APPLE
+
+    def restore(self, body, apple: Cell, direction: int, last_direction: int, ticks: int, status: int = MOVED,
+                free: Optional[Tuple[array, int]] = None) -> None:
+        """
+        Stellt einen gespeicherten Spielstand wieder her (body beginnt mit dem Kopf). 'free' ist eine
+        gespeicherte Reihenfolge der freien Felder (FreeCells.load), sonst wird sie aus dem Raster berechnet
+        """
+        self.body = deque(body)
+        self.grid[:] = bytes(len(self.grid))
+        for x, y in self.body:
+            self.grid[y * self.width + x] = BODY
+        self.grid[self.body[0][1] * self.width + self.body[0][0]] = HEAD
+        self.apple = apple
+        self.grid[apple[1] * self.width + apple[0]] = APPLE
+        if free is None:
+            self.free.rebuild(self.grid)
+        else:
+            self.free.load(*free)
+        self.direction = direction
+        self.last_direction = last_direction
+        self.ticks = ticks
+        self.status = status
+
+    @property
+    def head(self) -> Cell:
+        return self.body[0]
+
+    @property
+    def score(self) -> int:
+        return len(self.body) - 1
+
+    @property
+    def over(self) -> bool:
+        return self.status == DIED or self.status == WON
+
+    def turn(self, direction: Optional[int]) -> None:
+        """Ändert die Richtung, außer die Schlange würde sich damit umdrehen"""
+        if direction is not None and direction != opposite(self.last_direction):
+            self.direction = direction
+
+    def at(self, cell: Cell) -> int:
+        """Gibt den Inhalt eines Feldes zurück (EMPTY, BODY, HEAD oder APPLE)"""
+        return self.grid[cell[1] * self.width + cell[0]]
+
+    def next_cell(self) -> Optional[Cell]:
+        """Gibt das nächste Feld des Kopfes zurück oder None, falls es außerhalb des Spielfelds liegt"""
+        dx, dy = DELTAS[self.direction]
+        x = self.body[0][0] + dx
+        y = self.body[0][1] + dy
+        if self.wrap:
+            return x % self.width, y % self.height
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return x, y
+        return None
+
+    def spawn_apple(self) -> Optional[Cell]:
+        """
+        Gibt ein zufälliges, freies Feld zurück oder None, falls es keines mehr gibt.
+        Das alte Apfelfeld ist ausgeschlossen, damit der Apfel nicht an derselben Stelle auftaucht
+        """
+        return self.free.choice(self.rng, self.apple)
+
+    def step(self, action: Optional[int] = None) -> int:
+        """Führt einen Spielschritt aus und gibt MOVED, ATE, DIED oder WON zurück"""
+        if self.over:
+            return self.status
+        self.turn(action)
+        self.ticks += 1
+
+        cell = self.next_cell()
+        if cell is None: # Wand
+            self.status = DIED
+            return DIED
+
+        grid = self.grid
+        width = self.width
+        index = cell[1] * width + cell[0]
+        head = self.body[0]
+
+        if grid[index] == APPLE:
+            grid[head[1] * width + head[0]] = BODY
+            grid[index] = HEAD
+            self.body.appendleft(cell) # Die Schlange wächst, das Ende bleibt stehen
+            self.free.remove(cell)
+            self.last_direction = self.direction
+            if len(self.free) == 0:
+                # Spiel ist zu ende, der Spieler hat gewonnen
+                self.status = WON
+                return WON
+            self.apple = self.spawn_apple()
+            grid[self.apple[1] * width + self.apple[0]] = APPLE
+            self.eaten()
+            self.status = ATE
+            return ATE
+
+        # Das Ende der Schlange gibt sein Feld frei, bevor der Kopf es betritt
+        tail = self.body[-1]
+        if grid[index] == BODY and cell != tail:
+            self.status = DIED
+            return DIED
+        grid[head[1] * width + head[0]] = BODY
+        grid[tail[1] * width + tail[0]] = EMPTY
+        self.free.add(self.body.pop())
+        self.body.appendleft(cell)
+        grid[index] = HEAD
+        self.free.remove(cell)
+        self.last_direction = self.direction
+        self.status = MOVED
+        return MOVED
+
+    def eaten(self) -> None:
+        """Wird aufgerufen, nachdem die Schlange gewachsen ist und ein neuer Apfel liegt"""
+        pass
+
+class HeadSwitchEngine(Engine):
+    """Kopftausch: Nach jedem Apfel werden Kopf und Schwanzende vertauscht"""
+    switch_heads = True
+
+    def eaten(self) -> None:
+        self.body.reverse()
+        self.grid[self.body[-1][1] * self.width + self.body[-1][0]] = BODY
+        self.grid[self.body[0][1] * self.width + self.body[0][0]] = HEAD
+        # Die neue Richtung zeigt vom neuen Hals weg zum neuen Kopf
+        dx = self.body[0][0] - self.body[1][0]
+        dy = self.body[0][1] - self.body[1][1]
+        self.direction = self.last_direction = DELTAS.index((dx, dy))
+
+class WithoutWallEngine(Engine):
+    """Wandlos: Am Spielfeldrand kommt die Schlange auf der gegenüberliegenden Seite heraus"""
+    wrap = True
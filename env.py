@@ -0,0 +1,80 @@
+"""
+Umgebung für bestärkendes Lernen im Stil von Gym: reset(seed) -> Beobachtung,
+step(Aktion) -> Beobachtung, Belohnung, fertig, Info.
+
+Gespielt wird mit den Regeln der Spielmodi (Engine-Klassen aus game.py bzw. den Mods), ganz ohne Fenster;
+pygame.display wird nie benutzt. Die Beobachtung wird nicht pro Schritt neu erzeugt:
+
+- observation="grid": ein schreibgeschützter NumPy-View (Höhe x Breite, uint8) direkt auf das
+  Belegungsraster der Engine mit den Werten EMPTY, BODY, HEAD und APPLE (kein Kopieren)
+- observation="channels": ein einmal angelegtes Array (3 x Höhe x Breite, bool) mit den Ebenen
+  Kopf, Körper, Apfel, das bei jedem Schritt ohne neuen Speicher überschrieben wird
+
+In beiden Fällen ist es immer dasselbe Array; wer Beobachtungen aufheben will, muss sie kopieren.
+"""
+# Standardbibliothek
+from typing import Optional, Tuple, Union
+
+# externe Bibliothek
+import numpy as np
+
+# lokale Module
+from engine import Engine, MOVED, ATE, DIED, WON, BODY, HEAD, APPLE
+
+ACTIONS = 4 # Aktionen sind Richtungen wie in engine.py: UP, RIGHT, DOWN, LEFT
+REWARDS = {MOVED: 0.0, ATE: 1.0, DIED: -1.0, WON: 1.0} # Belohnung pro Ergebnis eines Schritts
+
+def engine_class(mode: Union[str, type]) -> type:
+    """Gibt die Engine-Klasse eines Spielmodus zurück (Name wie in get_gamemodes() oder Klasse)"""
+    if isinstance(mode, type):
+        return mode
+    from gamemodes import get_gamemodes
+    return get_gamemodes()[mode].gameclass.engine_class
+
+class SnakeEnv:
+    def __init__(self, mode: Union[str, type] = "Normal", size: Tuple[int, int] = (20, 20), seed=None,
+                 observation: str = "grid", max_ticks: Optional[int] = None, rewards: Optional[dict] = None):
+        if observation not in ("grid", "channels"):
+            raise ValueError(f"unbekannte Beobachtung '{observation}' (grid oder channels)")
+        self.engine: Engine = engine_class(mode)(tuple(size), seed)
+        self.size = (self.engine.width, self.engine.height)
+        self.observation = observation
+        self.max_ticks = max_ticks if max_ticks is not None else 100 * self.size[0] * self.size[1]
+        self.rewards = dict(REWARDS if rewards is None else rewards)
+        self.action_count = ACTIONS
+
+        # View auf das Belegungsraster; engine.reset/restore schreiben in dasselbe bytearray
+        self.grid = np.frombuffer(self.engine.grid, dtype=np.uint8).reshape(self.size[1], self.size[0])
+        self.grid.flags.writeable = False
+        self.channels = np.zeros((3, self.size[1], self.size[0]), dtype=bool)
+        self.info = {"status": MOVED, "score": 0, "ticks": 0, "truncated": False} # wird wiederverwendet
+
+    @property
+    def observation_shape(self) -> Tuple[int, ...]:
+        return self.grid.shape if self.observation == "grid" else self.channels.shape
+
+    def _observe(self) -> np.ndarray:
+        if self.observation == "grid":
+            return self.grid
+        np.equal(self.grid, HEAD, out=self.channels[0])
+        np.equal(self.grid, BODY, out=self.channels[1])
+        np.equal(self.grid, APPLE, out=self.channels[2])
+        return self.channels
+
+    def reset(self, seed=None) -> np.ndarray:
+        self.engine.reset(seed)
+        info = self.info
+        info["status"], info["score"], info["ticks"], info["truncated"] = MOVED, 0, 0, False
+        return self._observe()
+
+    def step(self, action: Optional[int]) -> Tuple[np.ndarray, float, bool, dict]:
+        """
+        Führt einen Spielschritt in Richtung 'action' aus (None behält die Richtung bei). Nach dem Ende
+        eines Spiels muss reset() aufgerufen werden
+        """
+        engine = self.engine
+        status = engine.step(None if action is None else int(action))
+        truncated = not engine.over and engine.ticks >= self.max_ticks
+        info = self.info
+        info["status"], info["score"], info["ticks"], info["truncated"] = status, engine.score, engine.ticks, truncated
+        return self._observe(), self.rewards[status], engine.over or truncated, info
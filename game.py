@@ -2,6 +2,8 @@
 from typing import Union, Tuple
 import random
 import logging
+import os
+import time
 
 # externe Bibliothek
 import pygame
@@ -9,37 +11,35 @@ from pygame.locals import (
     K_ESCAPE,
     KEYDOWN,
     QUIT,
-    K_BACKSPACE
+    K_BACKSPACE,
+    K_F3
 ) # Tastenevents
-from pygame.color import THECOLORS
 
 # lokale Module
-from main import center
-from sprites import SnakeHead, Apple, Tail, TexturePack
+import autopilot
+import overlay
+import profiler
+from sprites import Direction, SnakeHead, Apple, TexturePack
 from settings import Settings
 from gamemodes import get_gamemodes, Gamemode
-
-pygame.font.init() # Aufrufen, falls pygame.font noch nicht initialisiert ist
+from engine import Engine, HeadSwitchEngine, WithoutWallEngine, ATE, DIED, WON
+from replay import Replay
+from viewport import Camera, viewport_size
+from telemetry import Telemetry, queue_file_handler
 
 # KONSTANTE
-FONT_NAME = 'Calibri'
-
-def hits_wall(obj: Union[SnakeHead, Tail], size: Tuple[int, int]) -> bool:
-    """Gibt Wahr zurück, falls das obj-Objekt den Spielfeldrand überschreitet"""
-    topleft = obj.rect.topleft
-
-    if topleft[0] >= size[0] or topleft[1] >= size[1]:
-        return True
-
-    elif topleft[0] < 0 or topleft[1] < 0:
-        return True
-
-    return False
+# Liegt das Spiel mehr als MAX_LAG ms (aber mindestens MAX_CATCHUP Schritte) zurück,
+# wird der Rest verworfen statt nachgeholt
+MAX_LAG = 250
+MAX_CATCHUP = 5
 
 class Game:
     """
-    Basisklasse für das Spiel, die bereits die standard Snake-Variante implementiert
+    Basisklasse für das Spiel, die bereits die standard Snake-Variante implementiert.
+    Die Spielregeln stecken in 'engine_class', die Klasse selbst stellt das Spiel nur dar
     """
+    engine_class = Engine
+
     def __init__(self, settings: Settings, logger_file=None, lvl=10, config=None):
         self.config = config
 
@@ -53,44 +53,90 @@ class Game:
             if len(self.logger.handlers) == 0: # Damit nicht bei jedem Reinitialisieren alles neu konfigurert wird
                 self.logger.setLevel(lvl)
                 format = logging.Formatter('%(name)s -> %(asctime)s : %(levelname)s : %(message)s', datefmt='%d/%m/%Y %H:%M:%S')
-                fh = logging.FileHandler(logger_file)
-                fh.setLevel(lvl)
-                fh.setFormatter(format)
-                self.logger.addHandler(fh)
-                self.logger.info(f"instance of {type(self)} created")
+                # Die Datei wird im Hintergrund geschrieben, damit das Logging das Spiel nicht ausbremst
+                self.logger.addHandler(queue_file_handler(logger_file, lvl, format))
+                self.logger.info("instance of %s created", type(self))
 
             #self.logger.debug(f"Created an Apple at {self.apple.rect.topleft}")
 
         self.settings = settings.copy(autosave=False)
+        self.telemetry = None # Spielschritte im Debug-Modus, siehe telemetry.py und run()
+        # Zeitmessung der Phasen von run(), nur mit 'python main.py profile' (F3 zeigt die Werte an)
+        self.profiler = profiler.PhaseProfiler() if profiler.ENABLED else None
+        self.show_profile = False
+        self._profile_surface = None
+        self._profile_time = 0.0
+        # Ohne Spieler, mit 'python main.py autopilot' (siehe autopilot.py)
+        self.autopilot = autopilot.HamiltonianController() if autopilot.ENABLED else None
 
         # Texturen
         self.texturepack = TexturePack(self.settings.texturepack, self.settings)
         if not self.texturepack.isfull():
             if self.logging:
-                self.logger.warning(f"can't use the {self.texturepack.name} TexturePack\nLoading default...")
+                self.logger.warning("can't use the %s TexturePack\nLoading default...", self.texturepack.name)
             self.texturepack = TexturePack("default", self.settings)
 
         # Spiel/Spielstand
         self.clock = pygame.time.Clock()
         self.running = False
         self.quit = False
+        self.start_speed = self.settings.snakespeed
+
+        # Spielregeln
+        self.engine = self.engine_class(self.settings.size)
 
         # Spieler
         self.snake = SnakeHead(self.texturepack)
-        self.snake.texture()
-        self.apple = Apple(get_apple_position(self.snake, settings), self.texturepack)
+        self.apple = Apple(self.to_pixels(self.engine.apple), self.texturepack)
 
         # Spielobjekte
         self.all_entities = pygame.sprite.Group(self.apple, self.snake)
         self.tails = pygame.sprite.Group()
 
+        # Seit der letzten Darstellung veränderte Spielobjekte und frei gewordene Felder
+        self.dirty_sprites = set()
+        self.dirty_rects = []
+
         # Spielobjekte mit der Snake "verbinden"
         self.snake.tail_group = self.tails
         self.snake.all_group = self.all_entities
+        self.snake.dirty_sprites = self.dirty_sprites
+        self.snake.dirty_rects = self.dirty_rects
+
+        # Ist das Spielfeld größer als das Fenster, zeigt eine Kamera nur den Ausschnitt um den Kopf
+        view = viewport_size(self.settings)
+        self.camera = None
+        if view is not None:
+            self.camera = Camera(self.settings.size, view, self.settings.tilesize, self.texturepack)
+        self.screensize = self.settings.realsize if self.camera is None else self.camera.screensize
+
+        self.mainscreen = pygame.display.set_mode(self.screensize)
+
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Startet ein neues Spiel. Texturen, Fenster, Sprites und Logger bleiben erhalten,
+        nur der Spielstand wird zurückgesetzt
+        """
+        self.settings.snakespeed = self.start_speed
+
+        # Spielregeln; mit dem Startwert und den Eingaben lässt sich das Spiel wiederholen
+        self.seed = random.getrandbits(64)
+        self.engine.reset(self.seed)
+        self.replay = Replay(self.seed, self.settings.gamemode,
+                             {"size": self.settings.size, "snakespeed": self.settings.snakespeed, "config": self.config})
+
+        self.snake.reset()
+        self.snake.texture()
+        self.apple.rect.topleft = self.to_pixels(self.engine.apple)
+        if self.camera is not None:
+            self.camera.center(self.engine.head)
 
-        self.mainscreen = pygame.display.set_mode(self.settings.realsize)
-
-
+        self.dirty_sprites.clear()
+        self.dirty_rects.clear()
+        self.redraw = True # Wahr, wenn das ganze Spielfeld neu gezeichnet werden muss
+        self.reset_timer()
 
     def events(self) -> None:
         for event in pygame.event.get():
@@ -102,115 +148,227 @@ class Game:
                 if event.key == K_ESCAPE:
                     self.pause()
 
+                if event.key == K_F3 and self.profiler is not None:
+                    self.show_profile = not self.show_profile
+                    self.redraw = True # Entfernt bzw. zeigt die Anzeige vollständig
+
             elif event.type == QUIT: # Programm beenden
                 self.running = False
                 self.quit = True
 
+    def to_pixels(self, cell: Tuple[int, int]) -> Tuple[int, int]:
+        """Rechnet ein Feld der Engine in die Pixelkoordinaten seiner oberen linken Ecke um"""
+        return cell[0] * self.settings.tilesize[0], cell[1] * self.settings.tilesize[1]
+
     def apple_logic(self) -> None:
-        collide_with_apple = False
-        if pygame.sprite.collide_rect(self.snake.next_pos(), self.apple): # Wenn der Spieler den Apfel isst
-            collide_with_apple = True
-            apple_position = get_apple_position(self.snake, self.settings, self.apple.rect.topleft)
-            self.apple.kill()  # Entfernt den Apfel von 'all_entities'
-            if apple_position is False:
-                # Spiel ist zu ende, der Spieler hat gewonnen
-                self.win()
-                return
-            self.apple = Apple(apple_position, self.texturepack)
-            self.all_entities.add(self.apple)
-            self.settings.snakespeed += self.config.get("speed_increase")
-
-        self.snake.update(collide_with_apple)  # Bewegt den Spieler
+        if self.autopilot is not None:
+            direction = self.autopilot(self.engine)
+            if direction is not None:
+                self.snake.direction = Direction.from_index(direction)
+
+        # Die Engine bewegt die Schlange und prüft, ob der Apfel gegessen wurde
+        action = self.snake.direction.index
+        status = self.engine.step(action)
+        self.replay.record(self.engine, action)
+        if status == WON:
+            # Spiel ist zu ende, der Spieler hat gewonnen
+            self.win()
+            return
+        if status == DIED: # Die Schlange bleibt stehen, snake_logic beendet das Spiel
+            return
+        if status == ATE:
+            self.dirty_rects.append(self.apple.rect.copy())
+            self.dirty_sprites.add(self.apple)
+            self.apple.rect.topleft = self.to_pixels(self.engine.apple)
+            self.settings.snakespeed += self.config.get("speed_increase", 0)
+
+        # Die Darstellung der Schlange wird an die Engine angepasst. Neu aufgebaut werden muss sie nur,
+        # wenn sich ihre Reihenfolge umgedreht hat
+        reversed_ = status == ATE and self.engine.switch_heads
+        self.snake.update(self.engine, full=reversed_, settings=self.settings if self.engine.wrap else None)
+        if self.camera is not None and self.camera.follow(self.engine.head):
+            self.redraw = True # Der Ausschnitt hat sich verschoben
 
     def snake_logic(self) -> None:
-        if hits_wall(self.snake, self.settings.realsize) or pygame.sprite.spritecollide(self.snake, self.tails, dokill=False):
+        if self.engine.status == DIED:
             # Wenn die Snake gegen eine Wand oder gegen ein Schwanzteil trifft
             if self.logging:
-                self.logger.debug(f"Collision with Wall: {hits_wall(self.snake, self.settings.realsize)}, Tails: {bool(pygame.sprite.spritecollide(self.snake, self.tails, dokill=False))}")
+                self.logger.debug("Collision at %s", self.engine.next_cell())
             self.dead()
 
+    def reset_timer(self) -> None:
+        """Verwirft die angesammelte Zeit, z.B. nach einer Pause"""
+        self.lag = 0.0 # Zeit in ms, für die noch keine Spielschritte berechnet wurden
+        self.last_time = time.perf_counter()
+
     def run(self) -> None:
         self.running = True
-        passed_time = 0  # Zeit die seit der letzten Bildschirmaktualiserung vergangen ist
+        if self.logging and self.logger.isEnabledFor(logging.INFO):
+            # Jeder Spielschritt wird als kompakter Eintrag neben der Log-Datei aufgenommen
+            self.telemetry = Telemetry(f"{os.path.splitext(self.logger_file)[0]}.telemetry")
+        # Mit Zeitmessung läuft jede Phase über timed(), sonst wird sie direkt aufgerufen
+        phase = self.timed if self.profiler is not None else lambda _, function, *args: function(*args)
+        self.reset_timer()
+        last_render = self.last_time
+        changed = False # Wahr, wenn sich seit der letzten Darstellung etwas verändert hat
 
         self.draw()
 
         while self.running:
-            dt = self.clock.tick(self.settings.fps)
-            passed_time += dt # passed_time und dt sind in ms
-
-            self.events()
-
-            # Die Richtung, in die sich die Schlange bewegen soll, kann jederzeit geändert werden
-            self.snake.accept_direction(pygame.key.get_pressed())
-
-            if passed_time >= (1000/self.settings.snakespeed):
-                # Wenn die vergangene Zeit größer ist als 1000 durch 'Wie oft die Schlange sich pro sekunde Bewegen soll'
-                # durch '1000/' werden die Sekunden der snakespeed in millisekunden umgerechnet
-                # Beispiel: snakespeed = 2 (Schlange soll sich 2mal pro Sekunde bewegen) vergangene Zeit: 500ms | 500ms >=1000/2 -> 500ms >= 500 -> True
-
-                self.apple_logic()
-                self.snake_logic()
-
-                # Darstellung
-                self.draw()
-
-                pygame.display.flip() # Aktualisiert den Bildschirm
-
-                if self.logging:
-                    self.logger.info(f"game updated after {passed_time}ms ({passed_time/1000})s")
-                    self.logger.debug(f"Snake: Topleft: {self.snake.rect.topleft}, Direction: {self.snake.direction}, Edges: {self.snake.edges}")
-                    for tail in self.snake.tails:
-                        self.logger.debug(f"Tail: Topleft: {tail.rect.topleft}, Direction: {tail.direction}, Edges: {tail.edges}")
-
-                passed_time = 0 # Zurücksetzen der vergangenen Zeit
-
+            # Begrenzt, wie oft pro Sekunde Eingaben abgefragt werden
+            self.clock.tick(self.settings.fps)
+
+            # Die Zeit wird genau gemessen und angesammelt, damit keine Reste verloren gehen
+            now = time.perf_counter()
+            max_lag = max(MAX_LAG, MAX_CATCHUP * 1000 / self.settings.snakespeed)
+            self.lag = min(self.lag + (now - self.last_time) * 1000, max_lag)
+            self.last_time = now
+
+            phase("events", self.events)
+
+            # Die Richtung, in die sich die Schlange bewegen soll, kann jederzeit geändert werden.
+            # Mit Autopilot wird sie stattdessen vor jedem Spielschritt in apple_logic() bestimmt
+            if self.autopilot is None:
+                phase("accept_direction", self.snake.accept_direction, pygame.key.get_pressed())
+
+            # Es werden so viele Spielschritte berechnet, wie seit dem letzten Durchlauf fällig sind
+            # Beispiel: snakespeed = 2 (Schlange soll sich 2mal pro Sekunde bewegen) -> ein Schritt alle 1000/2 = 500ms
+            while self.running and self.lag >= 1000 / self.settings.snakespeed:
+                self.lag -= 1000 / self.settings.snakespeed
+
+                phase("apple_logic", self.apple_logic)
+                phase("snake_logic", self.snake_logic)
+                changed = True
+
+                if self.telemetry is not None:
+                    engine = self.engine
+                    self.telemetry.record(engine.ticks, engine.status, engine.head, len(engine.body), self.lag)
+
+            # Darstellung, unabhängig von den Spielschritten und höchstens 'render_fps' mal pro Sekunde
+            render_fps = self.settings.render_fps
+            if changed and self.running and (render_fps is None or (now - last_render) * render_fps >= 1):
+                rects = phase("draw", self.draw_dirty, False)
+                phase("present", self.present, rects)
+                last_render = now
+                changed = False
+
+        if self.telemetry is not None:
+            self.telemetry.close()
+            self.logger.info("telemetry: %d steps written to %s, %d dropped", self.telemetry.written,
+                             self.telemetry.path, self.telemetry.dropped)
+            self.telemetry = None
+        if self.profiler is not None:
+            print(self.profiler.report())
+            if self.logging:
+                self.logger.info("profile:\n%s", self.profiler.report())
         if self.logging:
             self.logger.info("game ended")
 
-    def draw(self):
-        # Hintergrund
-        self.mainscreen.blit(self.texturepack.background, self.texturepack.background.get_rect())
-
-        # Alle gegenstände werden gezeichnet
-        for entity in self.all_entities:
-            entity.draw(self.mainscreen)
-            #self.mainscreen.blit(entity.surf, entity.rect)
-
-        pygame.display.update() # Aktualisiert den Bildschirm
-
+    def timed(self, phase: str, function, *args):
+        """Ruft 'function' auf und misst die Zeit für die Phase 'phase'"""
+        start = self.profiler.now()
+        result = function(*args)
+        self.profiler.add(phase, self.profiler.now() - start)
+        return result
+
+    def present(self, rects=None) -> None:
+        """Bringt das Gezeichnete auf den Bildschirm; 'rects' beschränkt das auf die veränderten Stellen"""
+        if self.show_profile:
+            rect = self.draw_profile()
+            if rects is not None:
+                rects.append(rect)
+        if rects is None:
+            pygame.display.update()
+        else:
+            pygame.display.update(rects)
+
+    def draw_profile(self) -> pygame.Rect:
+        """Zeichnet die Messwerte oben links über das Spielfeld (höchstens viermal pro Sekunde neu berechnet)"""
+        now = time.perf_counter()
+        if self._profile_surface is None or now - self._profile_time >= 0.25:
+            font = overlay.get_font("Consolas", 14)
+            texts = [font.render(line, True, overlay.TEXT_COLOR) for line in self.profiler.lines()]
+            surface = pygame.Surface((max(text.get_width() for text in texts) + 8,
+                                      sum(text.get_height() for text in texts) + 8))
+            surface.fill((0, 0, 0)) # undurchsichtig, damit mehrfaches Zeichnen nichts verändert
+            y = 4
+            for text in texts:
+                surface.blit(text, (4, y))
+                y += text.get_height()
+            self._profile_surface = surface
+            self._profile_time = now
+        return self.mainscreen.blit(self._profile_surface, (0, 0))
+
+    def draw(self, present: bool = True):
+        """
+        Zeichnet das ganze Spielfeld (bzw. den ganzen Ausschnitt) neu.
+        Mit present=False wird nur gezeichnet und None (= ganzer Bildschirm) für present() zurückgegeben
+        """
+        atlas = self.texturepack.atlas.surface
+        if self.camera is None:
+            # Hintergrund
+            self.mainscreen.blit(self.texturepack.background, self.texturepack.background.get_rect())
+
+            # Alle gegenstände werden mit einem Aufruf aus dem Texturatlas gezeichnet
+            self.mainscreen.blits([(atlas, entity.rect, entity.area) for entity in self.all_entities], False)
+        else:
+            # Nur die sichtbaren Hintergrundstücke und Gegenstände
+            self.mainscreen.blits(self.camera.background_blits(), False)
+            view = self.camera.rect
+            self.mainscreen.blits([(atlas, self.camera.to_screen(entity.rect), entity.area)
+                                   for entity in self.all_entities if view.colliderect(entity.rect)], False)
+
+        self.dirty_sprites.clear()
+        self.dirty_rects.clear()
+        self.redraw = False
+        if present:
+            self.present() # Aktualisiert den Bildschirm
+
+    def draw_dirty(self, present: bool = True):
+        """
+        Zeichnet nur die Felder neu, die sich seit der letzten Darstellung verändert haben
+        (Kopf, Hals, Schwanzende und Apfel), und aktualisiert auch nur diese Stellen des Bildschirms.
+        Mit present=False werden die veränderten Stellen für present() zurückgegeben
+        """
+        if self.redraw:
+            return self.draw(present)
+
+        atlas = self.texturepack.atlas.surface
+        # Frei gewordene Felder und die Felder der veränderten Objekte bekommen wieder den Hintergrund,
+        # danach werden die Objekte darübergezeichnet (die Felder überschneiden sich nicht)
+        rects = self.dirty_rects + [sprite.rect for sprite in self.dirty_sprites]
+        if self.camera is None:
+            background = self.texturepack.background
+            self.mainscreen.blits([(background, rect, rect) for rect in rects], False)
+            self.mainscreen.blits([(atlas, sprite.rect, sprite.area) for sprite in self.dirty_sprites], False)
+        else:
+            view = self.camera.rect
+            rects = self.camera.visible(rects)
+            self.mainscreen.blits(self.camera.background_blits(rects), False)
+            self.mainscreen.blits([(atlas, self.camera.to_screen(sprite.rect), sprite.area)
+                                   for sprite in self.dirty_sprites if view.colliderect(sprite.rect)], False)
+            rects = [self.camera.to_screen(rect) for rect in rects]
+
+        self.dirty_sprites.clear()
+        self.dirty_rects.clear()
+        if not present:
+            return rects
+        self.present(rects) # Aktualisiert nur die veränderten Stellen des Bildschirms
 
     def grey_overlay(self):
-        grey_surf = pygame.Surface(self.settings.realsize)
-        grey_surf.fill((20, 20, 20, 180)) # Graue Farbe
-        grey_surf.set_alpha(180) # macht es Transparent
-        self.mainscreen.blit(grey_surf, grey_surf.get_rect())
+        self.mainscreen.blit(overlay.grey_overlay(self.screensize), (0, 0))
+
+    def show_message(self, text1: str, text2: str) -> None:
+        """Zeigt zwei Texte über dem grauen Overlay an"""
+        size = int(self.settings.size[0] * 2.5) # Den Faktor 2.5 habe ich 'experimentell' durch probieren ermittelt
+        overlay.show(self.mainscreen, self.screensize, text1, text2, size)
 
     def pause(self) -> None:
         if self.logging:
             self.logger.info("pause called")
 
         wait = True
-
-        # texts
-        size = int(self.settings.size[0] * 2.5) # Den Faktor 2.5 habe ich 'experimentell' durch probieren ermittelt
-        font = pygame.font.SysFont(FONT_NAME, size)
-        pause_text1 = font.render('Pause', False, THECOLORS.get("white"))
-        pause_text2 = font.render('Drücke Esc oder Backspace', False, THECOLORS.get("white"))
-
-        # Durchsichtiges Graues Overlay
-        self.grey_overlay()
-
-        # text1
-        pause_text1_centerpos = center(pause_text1, self.settings.realsize)
-        self.mainscreen.blit(pause_text1, pause_text1_centerpos)
-
-        # text2
-        pause_text2_centerpos = center(pause_text2, self.settings.realsize)
-        pause_text2_centerpos = (pause_text2_centerpos[0], pause_text2_centerpos[1] + pause_text2.get_height() + 20)  # 20: Platz zwischen den Texten
-        self.mainscreen.blit(pause_text2, pause_text2_centerpos)
-
-        pygame.display.flip() # Darstellung
+        self.show_message('Pause', 'Drücke Esc oder Backspace')
         while wait:
             for event in pygame.event.get():
                 if event.type == KEYDOWN:
@@ -227,49 +385,27 @@ class Game:
                     self.running = False
                     self.quit = True
         self.clock.tick() # Setzt den Timer der Clock auf 0 zurück
+        self.reset_timer() # Die Zeit der Pause wird nicht nachgeholt
+
+    def save_replay(self) -> None:
+        """Speichert die Wiederholung des Spiels neben der Log-Datei"""
+        path = f"{os.path.splitext(self.logger_file)[0]} {self.seed:016x}.replay"
+        self.replay.save(path)
+        self.logger.info("replay saved to %s", path)
 
     def dead(self) -> None:
         if self.logging:
             self.logger.info("dead called")
+            self.save_replay()
         wait = True
-        # texts
-        size = int(self.settings.size[0] * 2.5) # Font Größe
-        font = pygame.font.SysFont(FONT_NAME, size)
-        pause_text1 = font.render(f'Du hast {len(self.snake.tails)} Punkte erreicht', False, THECOLORS.get("white"))
-        pause_text2 = font.render('Drücke Esc oder Backspace', False, THECOLORS.get("white"))
-
-        # Durchsichtiges Graues Overlay
-        self.grey_overlay()
-
-        # text1
-        pause_text1_centerpos = center(pause_text1, self.settings.realsize)
-        self.mainscreen.blit(pause_text1, pause_text1_centerpos)
-
-        # text2
-        pause_text2_centerpos = center(pause_text2, self.settings.realsize)
-        pause_text2_centerpos = (pause_text2_centerpos[0], pause_text2_centerpos[1] + pause_text2.get_height() + 20)  # 20: space beetween the texts
-        self.mainscreen.blit(pause_text2, pause_text2_centerpos)
-
-
-        pygame.display.flip()
+        self.show_message(f'Du hast {self.engine.score} Punkte erreicht', 'Drücke Esc oder Backspace')
         while wait:
             for event in pygame.event.get():
                 if event.type == KEYDOWN:
                     if event.key == K_ESCAPE:
                         wait = False
                         # Startet ein neues Spiel
-
-                        logger = self.logger
-                        logger_file = self.logger_file
-                        logger_level = self.logger_level
-                        logging = self.logging
-
-                        self.__init__(self.settings, config=self.config) # Reinitialisiert die Instanz ohne logger
-                        # Den Logger der Instanz wieder hinzufügen
-                        self.logger = logger
-                        self.logger_file = logger_file
-                        self.logging_level = logger_level
-                        self.logging = logging
+                        self.reset()
                         self.running = True # Damit die Methode run() weiterläuft
 
                         if self.logging:
@@ -287,48 +423,19 @@ class Game:
     def win(self) -> None:
         if self.logging:
             self.logger.info("win called")
+            self.save_replay()
         wait = True
-        # texts
-        size = int(self.settings.size[0] * 2.5)
-        font = pygame.font.SysFont(FONT_NAME, size)
-        pause_text1 = font.render(f'Du hast gewonnen!', False, THECOLORS.get("white"))
-        pause_text2 = font.render('Drücke ESC oder Backspace', False, THECOLORS.get("white"))
-
-        # Durchsichtiges Graues Overlay
-        self.grey_overlay()
-
-        # text1
-        pause_text1_centerpos = center(pause_text1, self.settings.realsize)
-        self.mainscreen.blit(pause_text1, pause_text1_centerpos)
-
-        # text2
-        pause_text2_centerpos = center(pause_text2, self.settings.realsize)
-        pause_text2_centerpos = (pause_text2_centerpos[0], pause_text2_centerpos[1] + pause_text2.get_height() + 20)  # 20: space beetween the texts
-        self.mainscreen.blit(pause_text2, pause_text2_centerpos)
-
-
-        pygame.display.flip()
+        self.show_message('Du hast gewonnen!', 'Drücke ESC oder Backspace')
         while wait:
             for event in pygame.event.get():
                 if event.type == KEYDOWN:
                     if event.key == K_ESCAPE:
                         wait = False
                         # Startet ein neues Spiel
-
-                        logger = self.logger
-                        logger_file = self.logger_file
-                        logger_level = self.logger_level
-                        logging = self.logging
-
                         if self.logging:
                             self.logger.debug("starting a new Game from win")
 
-                        self.__init__(self.settings) # Reinitialisiert die Instanz ohne logger
-                        # Den Logger der Instanz wieder hinzufügen
-                        self.logger = logger
-                        self.logger_file = logger_file
-                        self.logging_level = logger_level
-                        self.logging = logging
+                        self.reset()
                         self.running = True # Damit die Methode run() weiterläuft
 
                     if event.key == K_BACKSPACE:
@@ -341,97 +448,27 @@ class Game:
                     self.quit = True
 
 class HeadSwitch(Game):
-    def apple_logic(self) -> None:
-        collide_with_apple = False
-        if pygame.sprite.collide_rect(self.snake.next_pos(), self.apple):
-            collide_with_apple = True
-            apple_position = get_apple_position(self.snake, self.settings, self.apple.rect.topleft)
-            self.apple.kill()
-            if apple_position is False:
-                # Spiel ist zu ende, der Spieler hat gewonnen
-                self.win()
-                return
-            self.apple = Apple(apple_position, self.texturepack)
-            self.all_entities.add(self.apple)
-            self.settings.snakespeed += self.config.get("speed_increase")
-
-        self.snake.update(collide_with_apple, False)
-        if collide_with_apple:
-            tail_to_switch = self.snake.tails.pop() # entfernt hinterstes Schwanzteil aus der Liste
-            self.snake.rect, tail_to_switch.rect = tail_to_switch.rect, self.snake.rect  # Positionen werden getauscht
-            self.snake.tails.reverse()  # Reihenfolge der Schwanzteile muss geändert werden
-            self.snake.tails.append(tail_to_switch) # hinterstes Schwanzteil wird wieder angefügt
-
-            self.snake.update_direction()  # Richtung der Schlange wird angepasst, falls nötig
-        self.snake.texture(full=collide_with_apple) # Schlange wird Dargestellt
+    engine_class = HeadSwitchEngine
 
 class WithoutWall(Game):
-    def snake_logic(self) -> None:
-        self.move(self.snake)
-        for tail in self.snake.tails:
-            self.move(tail)
+    engine_class = WithoutWallEngine
 
-        self.snake.texture(self.settings, self.collide_with_apple)
-        if pygame.sprite.spritecollide(self.snake, self.tails, dokill=False):
-            # Wenn die Snake gegen ein Schwanzteil trifft
-            if self.logging:
-                self.logger.debug(f"Collision with Tails")
-            self.dead()
 
-    def apple_logic(self) -> None:
-        self.collide_with_apple = False # wird als Attribute gespeichert, damit es für snake_logic verfügbar ist
-        sprite = self.snake.next_pos()
-        self.move(sprite)
-        if pygame.sprite.collide_rect(sprite, self.apple):
-            self.collide_with_apple = True
-            apple_position = get_apple_position(self.snake, self.settings, self.apple.rect.topleft)
-            self.apple.kill()  # Entfernt den Apfel von 'all_entities'
-            if apple_position is False:
-                # Spiel ist zu ende, der Spieler hat gewonnen
-                self.win()
-                return
-            self.apple = Apple(apple_position, self.texturepack)
-            self.all_entities.add(self.apple)
-            self.settings.snakespeed += self.config.get("speed_increase")
-
-        self.snake.update(self.collide_with_apple, False)  # Bewegt den Spieler
-
-
-    def move(self, obj) -> None:
-        """Stellt sicher, das die Koordinaten des obj-Objektes immer im Spielfeld sind"""
-        topleft = obj.rect.topleft
-        if topleft[0] < 0:
-            obj.rect.topleft = (self.settings.realsize[0]-self.settings.tilesize[0], topleft[1])
-        elif topleft[0] >= self.settings.realsize[0]:
-            obj.rect.topleft = (0, topleft[1])
-        elif topleft[1] < 0:
-            obj.rect.topleft = (topleft[0], self.settings.realsize[1]-self.settings.tilesize[1])
-        elif topleft[1] >= self.settings.realsize[1]:
-            obj.rect.topleft = (topleft[0], 0)
-
-
-def get_apple_position(snake: SnakeHead, settings: Settings, old_apple_topleft=None) -> Union[tuple, bool]:
+def get_apple_position(engine: Engine, settings: Settings, old_apple_topleft=None) -> Union[tuple, bool]:
     """
-    Die Funktion gibt eine zufällige, freie Position für den Apfel zurück.
-    Das Argument 'old_apple_topleft' wird genutzt, damit der Apfel nicht erneut an derselben Stelle auftaucht
+    Die Funktion gibt eine zufällige, freie Position (in Pixeln) für den Apfel zurück.
+    Das Argument 'old_apple_topleft' wird genutzt, damit der Apfel nicht erneut an derselben Stelle auftaucht.
+    Die freien Felder verwaltet die Engine selbst, deshalb muss das Spielfeld nicht durchsucht werden
     """
-    # Hier werden alle bereits Verwendeten Positionen in einem Set gespeichert
-    used_positions = set()
-    used_positions.add(snake.rect.topleft)
-    if old_apple_topleft is not None: used_positions.add(old_apple_topleft)
-    for tail in snake.tails:
-        used_positions.add(tail.rect.topleft)
-
-
-    possible_positions = [] # Alle freien Positionen
-    for topleft_x in range(0, settings.realsize[0], settings.tilesize[0]): # Koordinaten auf der x-Achse
-        for topleft_y in range(0, settings.realsize[1], settings.tilesize[1]): # Koordinaten auf der y-Achse
-            if (topleft_x, topleft_y) not in used_positions:
-                possible_positions.append((topleft_x, topleft_y)) # Position wird hinzugefügt
-    if len(possible_positions) == 0:
-        return False
+    tilesize = settings.tilesize
+    old_apple = None
+    if old_apple_topleft is not None:
+        old_apple = (old_apple_topleft[0] // tilesize[0], old_apple_topleft[1] // tilesize[1])
 
-    return random.choice(possible_positions)
+    cell = engine.free.choice(engine.rng, old_apple)
+    if cell is None:
+        return False
+    return cell[0] * tilesize[0], cell[1] * tilesize[1]
 
 def run(gamemode, presize: Tuple[int, int], logger_file, lvl) -> Tuple[pygame.Surface, bool]:
     quit = gamemode.run_game(logger_file, lvl)
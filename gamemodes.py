@@ -53,7 +53,10 @@ class Gamemode:
             self.plane.hide()
 
 
-def get_gamemodes():
+# Zwischenspeicher für get_gamemodes: (Signatur der Mods, Spielmodi)
+_registry = None
+
+def _load_gamemodes():
     from game import Game, WithoutWall, HeadSwitch
     from mods import mod_gamemodes
     HeadSwitch_Gamemode = Gamemode(HeadSwitch, HeadSwitchSettings)
@@ -66,3 +69,20 @@ def get_gamemodes():
 
     StandardGamemodes.update(mod_gamemodes())
     return StandardGamemodes
+
+def get_gamemodes():
+    """
+    Gibt alle Spielmodi zurück. Die Mods werden nur einmal pro Prozess ausgeführt und erst wieder,
+    wenn sich eine Mod-Datei oder der mods Ordner ändert
+    """
+    global _registry
+    from mods import mod_signature
+    signature = mod_signature()
+    if _registry is None or _registry[0] != signature:
+        _registry = (signature, _load_gamemodes())
+    return dict(_registry[1]) # Kopie, damit Aufrufer den Zwischenspeicher nicht verändern
+
+def clear_gamemodes() -> None:
+    """Verwirft die zwischengespeicherten Spielmodi, der nächste Aufruf von get_gamemodes lädt neu"""
+    global _registry
+    _registry = None
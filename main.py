@@ -14,6 +14,7 @@ import game
 from settings import Settings
 from sprites import TexturePack
 from gamemodes import get_gamemodes
+from telemetry import queue_file_handler
 
 # KONSTANTEN
 MAINSCREEN_SIZE = (800, 600) # Größe des Hauptbildschirms
@@ -39,11 +40,9 @@ class MainMenu:
                 os.makedirs("logs")
             self.logger_file = f"logs/{datetime.now().strftime('%d-%m-%Y %H.%M.%S')}.log"
             format = logging.Formatter('%(name)s -> %(asctime)s : %(levelname)s : %(message)s', datefmt='%d/%m/%Y %H:%M:%S')
-            fh = logging.FileHandler(self.logger_file) # Damit der logger in eine Datei schreibt
-            fh.setLevel(lvl)
-            fh.setFormatter(format)
-            self.logger.addHandler(fh)
-            self.logger.info(f"loaded settings: {self.settings.content}")
+            # Damit der logger in eine Datei schreibt; geschrieben wird in einem Hintergrund-Thread
+            self.logger.addHandler(queue_file_handler(self.logger_file, lvl, format))
+            self.logger.info("loaded settings: %s", self.settings.content)
 
         # Pygame initialisieren
         pygame.init()
@@ -291,6 +290,7 @@ class MainMenu:
 
             # Aktualisiert den Bildschirm
             pygame.display.flip()
+        self.settings.flush() # Noch nicht gespeicherte Einstellungen schreiben
         pygame.quit()
 
     def save(self) -> None:
@@ -445,6 +445,30 @@ if __name__ == "__main__": # ist nur Wahr, wenn main.py direkt aufgerufen wurde
     log = False
     lvl = logging.DEBUG # lvl = 10
 
+    # Zeitmessung der Spielschleife, z.B. "python main.py profile" oder "python main.py debug 2 profile"
+    if "profile" in (arg.lower() for arg in argv[1:]):
+        import profiler
+        profiler.ENABLED = True
+        argv = [arg for arg in argv if arg.lower() != "profile"]
+
+    # Der Autopilot spielt statt des Spielers, z.B. "python main.py autopilot" (Demo, Dauertests)
+    if "autopilot" in (arg.lower() for arg in argv[1:]):
+        import autopilot
+        autopilot.ENABLED = True
+        argv = [arg for arg in argv if arg.lower() != "autopilot"]
+
+    # Massensimulation ohne Fenster, z.B. "python main.py simulate --mode Wandlos --games 100000"
+    if len(argv) >= 2 and argv[1].lower() == "simulate":
+        from simulate import main as simulate
+        simulate(argv[2:])
+        exit(0)
+
+    # Benchmarks ohne Fenster, z.B. "python main.py benchmark run --output baseline.json"
+    if len(argv) >= 2 and argv[1].lower() == "benchmark":
+        from benchmark import main as benchmark
+        benchmark(argv[2:])
+        exit(0)
+
     # Überprüfen der übergebenen Argumente auf den Text "debug" und eine Zahl
     if len(argv) >= 2 and argv[1].lower() == "debug":
         log = True
@@ -1,31 +1,175 @@
+"""
+Laden von Mods.
 
-def mod_gamemodes():
-    from glob import iglob
-    import os
-    import importlib
+Jeder Mod liegt in einem eigenen Ordner in 'mods'. Eine 'mod.json' beschreibt den Mod, ohne dass dafür
+Code ausgeführt werden muss:
+
+    {"name": "Beispiel", "gamemodes": ["SPEED"], "entry": "mod.py"}
+
+'gamemodes' sind die Schlüssel aus dem GAMEMODES-dict des Einstiegsmoduls 'entry' (Standard: mod.py).
+Das Modul wird erst ausgeführt, wenn einer seiner Spielmodi gebraucht wird. Ordner ohne 'mod.json'
+werden wie bisher sofort ausgeführt.
+"""
+# Standardbibliothek
+from typing import Dict, List, Optional
+import importlib.util
+import json
+import os
+import sys
+
+# lokale Module
+from gamemodes import Gamemode
+
+MODS_DIRECTORY = "mods"
+MANIFEST = "mod.json"
+DEFAULT_ENTRY = "mod.py"
+
+# Bereits ausgeführte Mod-Module: Pfad -> (Änderungszeit, Modul)
+_modules = {}
+
+def mod_directories() -> List[str]:
+    """Gibt die Pfade aller Mod-Ordner zurück"""
+    if not os.path.isdir(MODS_DIRECTORY):
+        return []
+    paths = (os.path.join(MODS_DIRECTORY, name) for name in sorted(os.listdir(MODS_DIRECTORY)))
+    return [path for path in paths if os.path.isdir(path) and not os.path.basename(path).startswith(("_", "."))]
+
+def read_manifest(directory: str) -> Optional[dict]:
+    """Liest die 'mod.json' eines Mod-Ordners oder gibt None zurück, falls es keine gibt"""
+    path = os.path.join(directory, MANIFEST)
+    if not os.path.isfile(path):
+        return None
+    with open(path, "r", encoding="utf-8") as file:
+        manifest = json.load(file)
+    manifest.setdefault("name", os.path.basename(directory))
+    manifest.setdefault("gamemodes", [])
+    manifest["entry"] = os.path.join(directory, manifest.get("entry", DEFAULT_ENTRY))
+    return manifest
+
+def mod_files() -> List[str]:
+    """Gibt die Pfade aller Dateien zurück, von denen die geladenen Spielmodi abhängen"""
+    files = []
+    for directory in mod_directories():
+        path = os.path.join(directory, MANIFEST)
+        entry = os.path.join(directory, DEFAULT_ENTRY)
+        if os.path.isfile(path):
+            files.append(path)
+            try:
+                entry = read_manifest(directory)["entry"]
+            except (OSError, ValueError): # Den Fehler meldet mod_gamemodes
+                pass
+        if os.path.isfile(entry):
+            files.append(entry)
+    return files
+
+def mod_signature():
+    """
+    Gibt die Änderungszeiten des mods Ordners und aller Mods zurück.
+    Solange sich der Wert nicht ändert, müssen die Mods nicht neu geladen werden
+    """
+    if not os.path.isdir(MODS_DIRECTORY):
+        return ()
+    signature = [os.stat(MODS_DIRECTORY).st_mtime_ns]
+    for path in mod_files():
+        stat = os.stat(path)
+        signature.append((path, stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+def load_module(path: str):
+    """
+    Führt ein Mod-Modul aus oder gibt das schon ausgeführte zurück, solange sich die Datei nicht
+    geändert hat. Den Bytecode legt importlib wie bei normalen Modulen in __pycache__ ab
+    """
+    path = os.path.abspath(path)
+    mtime = os.stat(path).st_mtime_ns
+    if path in _modules and _modules[path][0] == mtime:
+        return _modules[path][1]
+    name = f"mods.{os.path.basename(os.path.dirname(path))}"
+    spec = importlib.util.spec_from_file_location(name, path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    _modules[path] = (mtime, mod)
+    return mod
+
+def as_gamemode(value) -> Optional[Gamemode]:
+    """Macht aus einem Eintrag im GAMEMODES-dict ein Gamemode-Objekt oder gibt None zurück"""
     from game import Game
-    from gamemodes import Gamemode
-    
-    gamemodes = {}
-    for mod_directory in iglob("mods\\*"):
-        name = os.path.basename(mod_directory)
+    if isinstance(value, Gamemode):
+        return value
+    if isinstance(value, type) and issubclass(value, Game):
+        return Gamemode(value)
+    return None
 
-        if not os.path.exists(f"{mod_directory}\\mod.py"):
-            continue
+class ModGamemode(Gamemode):
+    """Spielmodus aus einer 'mod.json'; das Mod-Modul wird erst bei der ersten Verwendung ausgeführt"""
+    def __init__(self, manifest: dict, key: str):
+        super().__init__(None)
+        self.manifest = manifest
+        self.key = key
+        self._ui_manager = None
+        self._loaded = False
+
+    @property
+    def gameclass(self):
+        self.load()
+        return self._gameclass
+
+    @gameclass.setter
+    def gameclass(self, gameclass):
+        self._gameclass = gameclass
+
+    def load(self) -> None:
+        """Führt das Mod-Modul aus und übernimmt Spielklasse und Subsettingsklasse"""
+        if self._loaded:
+            return
+        gamemode = as_gamemode(getattr(load_module(self.manifest["entry"]), "GAMEMODES", {}).get(self.key))
+        if gamemode is None:
+            raise LookupError(f"Mod {self.manifest['name']} has no gamemode {self.key}")
+        self._gameclass = gamemode.gameclass
+        self._subsettingsclass = gamemode._subsettingsclass
+        self._loaded = True
+        if self._settings is not None: # init wurde schon aufgerufen
+            super().init(self._settings, self._ui_manager)
+
+    def init(self, settings, ui_manager):
+        # Die Subsettings werden erst erstellt, wenn der Mod geladen ist
+        self._settings = settings
+        self._ui_manager = ui_manager
+        if self._loaded:
+            super().init(settings, ui_manager)
 
-        module_path = os.path.abspath(f"{mod_directory}\\mod.py")
-        spec = importlib.util.spec_from_file_location("mod", module_path)
-        mod = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(mod)
-        if not hasattr(mod, "GAMEMODES"):
+    @property
+    def has_subsettings(self) -> bool:
+        self.load()
+        return self.subsettings is not None
+
+def legacy_gamemodes(directory: str) -> Dict[str, Gamemode]:
+    """Führt einen Mod ohne 'mod.json' sofort aus und gibt seine Spielmodi zurück"""
+    path = os.path.join(directory, DEFAULT_ENTRY)
+    if not os.path.isfile(path):
+        return {}
+    mod = load_module(path)
+    if not hasattr(mod, "GAMEMODES"):
+        return {}
+    gamemodes = {}
+    for key, value in mod.GAMEMODES.items():
+        gamemode = as_gamemode(value)
+        if gamemode is None: # Ungültiger Eintrag, der Mod wird ignoriert
+            return {}
+        gamemodes[key] = gamemode
+    return gamemodes
+
+def mod_gamemodes() -> Dict[str, Gamemode]:
+    gamemodes = {}
+    for directory in mod_directories():
+        try:
+            manifest = read_manifest(directory)
+        except (OSError, ValueError) as error:
+            print(f"Couldn't read the manifest of {directory}: {error}", file=sys.stderr)
             continue
-        for key, value in mod.GAMEMODES.items():
-            if issubclass(type(value), Game):
-                mod.GAMEMODES[key] = Gamemode(value)
-                continue
-
-            if not isinstance(value, Gamemode):
-                break
-        else: # kein break fand statt
-            gamemodes.update(mod.GAMEMODES)
+        if manifest is None:
+            gamemodes.update(legacy_gamemodes(directory))
+        else:
+            for key in manifest["gamemodes"]:
+                gamemodes[key] = ModGamemode(manifest, key)
     return gamemodes
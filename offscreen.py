@@ -0,0 +1,213 @@
+"""
+Darstellung von Spielständen als NumPy-Bilder, ohne Fenster (für Agenten mit Pixelbeobachtungen und Vorschaubilder).
+
+Gezeichnet wird mit den Texturen eines TexturePack in ein Surface, dessen Pixel in einem NumPy-Array
+liegen (pygame.image.frombuffer). 'render' gibt einen View (Höhe x Breite x 3, RGB) auf diese Pixel
+zurück, ohne zu kopieren; er bleibt gültig und zeigt immer das zuletzt gezeichnete Bild. Anders als bei
+pygame.surfarray.pixels3d wird das Surface dabei nicht gesperrt.
+
+Mit 'thumbnail' wird jedes Feld zu einem einzigen Pixel (mittlere Farbe seiner Textur), ganz ohne Blitten.
+'render_batch' zeichnet mehrere Spielstände in ein einmal angelegtes Array.
+
+Ein Spielstand ist eine Engine aus engine.py (oder etwas mit deren Attributen, z.B. env.SnakeEnv.engine).
+'render_batch' nimmt auch eine batch.BatchEngine und zeichnet dann jedes ihrer Spiele.
+"""
+# Standardbibliothek
+from typing import Optional, Sequence, Tuple, Union
+
+# externe Bibliothek
+import numpy as np
+import pygame
+
+# lokale Module
+from atlas import edge_key
+from batch import BatchEngine
+from engine import Engine, EMPTY, BODY, HEAD, APPLE, WON, opposite
+from settings import Settings
+from sprites import TexturePack
+
+# Farbmasken für Texturen mit derselben Reihenfolge der Farbkanäle wie OffscreenRenderer._pixels (R, G, B, Alpha)
+RGBA_MASKS = (0xFF, 0xFF00, 0xFF0000, 0xFF000000)
+
+def edge_mask(cell: Tuple[int, int], previous: Tuple[int, int], following: Optional[Tuple[int, int]],
+              size: Tuple[int, int], wrap: bool) -> int:
+    """
+    Kanten eines Schwanzteils wie in SnakeHead._full_render, aber in Feldkoordinaten.
+    Gibt die Maske für TexturePack.with_edges zurück (Bit 0 oben, 1 rechts, 2 unten, 3 links)
+    """
+    top = right = bottom = left = True
+    x, y = cell
+    for neighbour in (previous, following):
+        if neighbour is None:
+            continue
+        if x - 1 == neighbour[0]:
+            left = False
+        elif x + 1 == neighbour[0]:
+            right = False
+        elif y - 1 == neighbour[1]:
+            top = False
+        elif y + 1 == neighbour[1]:
+            bottom = False
+
+    if wrap: # Nachbarn auf der anderen Seite des Spielfelds
+        last_x, last_y = size[0] - 1, size[1] - 1
+        if following is not None and x == 0 and following[0] == last_x:
+            left = False
+        elif following is not None and x == last_x and following[0] == 0:
+            right = False
+        elif x == last_x and previous[0] == 0:
+            right = False
+        elif x == 0 and previous[0] == last_x:
+            left = False
+        elif following is not None and y == 0 and following[1] == last_y:
+            top = False
+        elif following is not None and y == last_y and following[1] == 0:
+            bottom = False
+        elif y == last_y and previous[1] == 0:
+            bottom = False
+        elif y == 0 and previous[1] == last_y:
+            top = False
+    return top | right << 1 | bottom << 2 | left << 3
+
+class _BatchGame:
+    """Ein Spiel einer BatchEngine mit den Attributen einer Engine, die der Renderer braucht"""
+    def __init__(self, batch: BatchEngine, row: int):
+        self.width, self.height = batch.width, batch.height
+        self.wrap = batch.wrap
+        self.grid = batch.grid[row]
+        self.body = batch.cells(row)
+        self.last_direction = int(batch.last_direction[row])
+        apple = int(batch.apple[row])
+        # Nach dem Sieg liegt kein Apfel mehr, 'apple' ist dann veraltet
+        self.apple = None if batch.status[row] == WON else (apple % batch.width, apple // batch.width)
+
+class OffscreenRenderer:
+    def __init__(self, settings: Optional[Settings] = None, texturepack: Optional[TexturePack] = None,
+                 thumbnail: bool = False):
+        if texturepack is None:
+            settings = settings if settings is not None else Settings()
+            if pygame.display.get_surface() is None:
+                # Die Texturen werden mit convert_alpha geladen, das braucht einen (unsichtbaren) Videomodus
+                pygame.display.init()
+                pygame.display.set_mode((1, 1), pygame.HIDDEN if hasattr(pygame, "HIDDEN") else 0)
+            texturepack = TexturePack(settings.texturepack, settings)
+            if not texturepack.isfull():
+                texturepack = TexturePack("default", settings)
+        self.texturepack = texturepack
+        self.settings = texturepack._settings
+        self.size = tuple(self.settings.size)
+        self.tilesize = tuple(self.settings.tilesize)
+        self.thumbnail = thumbnail
+        width, height = self.size
+
+        if thumbnail:
+            self.shape = (height, width, 3)
+            self._frame = np.zeros(self.shape, dtype=np.uint8)
+            # Farbtabelle: für jeden Feldinhalt und jedes Feld eine Farbe (der Hintergrund ist gemustert)
+            self._colors = np.zeros((4, height * width, 3), dtype=np.uint8)
+            background = pygame.transform.smoothscale(self.texturepack.background.convert(), (width, height))
+            self._colors[EMPTY] = pygame.surfarray.array3d(background).transpose(1, 0, 2).reshape(-1, 3)
+            for code, name in ((BODY, "SNAKEBODY"), (HEAD, "SNAKEHEAD"), (APPLE, "APPLE")):
+                self._colors[code] = pygame.transform.average_color(self.texturepack._textures[name])[:3]
+            self._colors = self._colors.reshape(-1, 3)
+            self._offsets = np.arange(height * width, dtype=np.intp)
+            self._index = np.zeros(height * width, dtype=np.intp)
+            return
+
+        self.realsize = tuple(self.settings.realsize)
+        self.shape = (self.realsize[1], self.realsize[0], 3)
+        # Die Pixel des Surface liegen in '_pixels' (4 Bytes pro Pixel: R, G, B, ungenutzt). In Surfaces mit
+        # 3 Bytes pro Pixel wäre jedes Blitten mit Alphakanal um ein Vielfaches langsamer
+        self._pixels = np.zeros((self.realsize[1], self.realsize[0], 4), dtype=np.uint8)
+        self.surface = pygame.image.frombuffer(self._pixels, self.realsize, "RGBX")
+        self._frame = self._pixels[:, :, :3]
+        # Der Hintergrund wird als fertige Pixel kopiert statt geblittet
+        self.surface.blit(self.texturepack.background, (0, 0))
+        self._background = self._pixels.copy()
+        # Der Atlas bekommt dieselbe Reihenfolge der Farbkanäle wie das Ziel, sonst rechnet SDL jedes Pixel um
+        atlas = self.texturepack.atlas
+        self._atlas = atlas.surface.convert(pygame.Surface((1, 1), pygame.SRCALPHA, 32, RGBA_MASKS))
+        self._apple_area = atlas.rects["APPLE"]
+        self._head_areas = [atlas.rects[edge_key("SNAKEHEAD", mask)] for mask in range(16)]
+        self._body_areas = [atlas.rects[edge_key("SNAKEBODY", mask)] for mask in range(16)]
+
+    def _check(self, engine: Engine) -> None:
+        if (engine.width, engine.height) != self.size:
+            raise ValueError(f"Spielfeld {engine.width}x{engine.height} passt nicht zum Renderer "
+                             f"({self.size[0]}x{self.size[1]})")
+
+    def blits(self, engine: Engine) -> list:
+        """Gibt die Argumente für Surface.blits zurück, die Apfel und Schlange zeichnen"""
+        atlas = self._atlas
+        tile_width, tile_height = self.tilesize
+        body = engine.body
+        blits = []
+        if engine.apple is not None:
+            blits.append((atlas, (engine.apple[0] * tile_width, engine.apple[1] * tile_height), self._apple_area))
+
+        head = body[0]
+        if len(body) == 1:
+            blits.append((atlas, (head[0] * tile_width, head[1] * tile_height), self._head_areas[15]))
+            return blits
+        # Der Kopf ist zur Schlange hin offen, ein einzelnes Schwanzteil zum Kopf hin
+        direction = engine.last_direction
+        blits.append((atlas, (head[0] * tile_width, head[1] * tile_height),
+                      self._head_areas[15 & ~(1 << opposite(direction))]))
+        if len(body) == 2:
+            blits.append((atlas, (body[1][0] * tile_width, body[1][1] * tile_height),
+                          self._body_areas[15 & ~(1 << direction)]))
+            return blits
+
+        size, wrap = self.size, engine.wrap
+        cells = list(body)
+        last = len(cells) - 1
+        for index in range(1, len(cells)):
+            cell = cells[index]
+            mask = edge_mask(cell, cells[index - 1], cells[index + 1] if index < last else None, size, wrap)
+            blits.append((atlas, (cell[0] * tile_width, cell[1] * tile_height), self._body_areas[mask]))
+        return blits
+
+    def _thumbnail(self, engine: Engine, frame: np.ndarray) -> None:
+        grid = np.frombuffer(engine.grid, dtype=np.uint8)
+        # Index in die Farbtabelle: Inhalt * Felder + Feld
+        np.copyto(self._index, grid)
+        self._index *= len(self._offsets)
+        self._index += self._offsets
+        np.take(self._colors, self._index, axis=0, out=frame.reshape(-1, 3))
+
+    def render(self, engine: Engine) -> np.ndarray:
+        """
+        Zeichnet den Spielstand und gibt das Bild (Höhe x Breite x 3, uint8, RGB) zurück. Es ist immer
+        dasselbe Array, das beim nächsten Aufruf überschrieben wird
+        """
+        self._check(engine)
+        if self.thumbnail:
+            self._thumbnail(engine, self._frame)
+            return self._frame
+        np.copyto(self._pixels, self._background)
+        self.surface.blits(self.blits(engine), False)
+        return self._frame
+
+    def render_batch(self, engines: Union[Sequence[Engine], BatchEngine], out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Zeichnet mehrere Spielstände (Engines oder alle Spiele einer BatchEngine) in 'out'
+        (Anzahl x Höhe x Breite x 3, uint8). Ohne 'out' wird das Array einmal angelegt; für viele
+        Aufrufe sollte es wiederverwendet werden
+        """
+        if isinstance(engines, BatchEngine):
+            engines = [_BatchGame(engines, row) for row in range(engines.count)]
+        if out is None:
+            out = np.empty((len(engines), *self.shape), dtype=np.uint8)
+        elif (out.shape[0] < len(engines) or out.shape[1:] != self.shape or out.dtype != np.uint8
+              or not out.flags.c_contiguous):
+            raise ValueError(f"'out' muss ein zusammenhängendes uint8-Array der Form "
+                             f"(>= {len(engines)}, {', '.join(map(str, self.shape))}) sein")
+        for index, engine in enumerate(engines):
+            if self.thumbnail:
+                self._check(engine)
+                self._thumbnail(engine, out[index])
+                continue
+            self.render(engine)
+            # SDL wandelt die Pixel beim Blitten in out[index] um (schneller als eine Kopie mit NumPy)
+            pygame.image.frombuffer(out[index], self.realsize, "RGB").blit(self.surface, (0, 0))
+        return out
@@ -0,0 +1,61 @@
+"""
+Überlagerungen für Pause, Tod und Sieg.
+
+Schriften, gerenderte Texte und das graue Overlay werden zwischengespeichert, weil
+pygame.font.SysFont die Systemschriften durchsucht und ein bildschirmgroßes Surface teuer ist.
+"""
+# Standardbibliothek
+from functools import lru_cache
+from typing import Dict, Tuple
+
+# externe Bibliothek
+import pygame
+from pygame.color import THECOLORS
+
+# lokale Module
+from main import center
+
+pygame.font.init() # Aufrufen, falls pygame.font noch nicht initialisiert ist
+
+# KONSTANTEN
+FONT_NAME = 'Calibri'
+TEXT_COLOR = tuple(THECOLORS.get("white")) # als Tupel, damit die Farbe als Schlüssel im Cache taugt
+TEXT_SPACING = 20 # Platz zwischen den Texten
+
+_overlays: Dict[Tuple[int, int], pygame.Surface] = {}
+
+@lru_cache(maxsize=None)
+def get_font(name: str, size: int) -> pygame.font.Font:
+    return pygame.font.SysFont(name, size)
+
+@lru_cache(maxsize=64)
+def render_text(text: str, size: int, color=TEXT_COLOR, name: str = FONT_NAME) -> pygame.Surface:
+    """Gibt den gerenderten Text zurück; das Surface wird geteilt und darf nicht verändert werden"""
+    return get_font(name, size).render(text, False, color)
+
+def grey_overlay(resolution: Tuple[int, int]) -> pygame.Surface:
+    """Gibt ein durchsichtiges, graues Surface in der Größe 'resolution' zurück"""
+    resolution = tuple(resolution)
+    if resolution not in _overlays:
+        grey_surf = pygame.Surface(resolution)
+        if pygame.display.get_surface() is not None:
+            grey_surf = grey_surf.convert() # Im Format des Bildschirms geht das Blitten schneller
+        grey_surf.fill((20, 20, 20)) # Graue Farbe
+        grey_surf.set_alpha(180) # macht es Transparent
+        _overlays[resolution] = grey_surf
+    return _overlays[resolution]
+
+def show(screen: pygame.Surface, resolution: Tuple[int, int], text1: str, text2: str, size: int) -> None:
+    """Legt das graue Overlay über 'screen' und zeigt zwei Texte untereinander in der Mitte an"""
+    screen.blit(grey_overlay(resolution), (0, 0))
+
+    # text1
+    surface1 = render_text(text1, size)
+    screen.blit(surface1, center(surface1, resolution))
+
+    # text2
+    surface2 = render_text(text2, size)
+    text2_centerpos = center(surface2, resolution)
+    screen.blit(surface2, (text2_centerpos[0], text2_centerpos[1] + surface2.get_height() + TEXT_SPACING))
+
+    pygame.display.flip() # Darstellung
@@ -0,0 +1,73 @@
+"""
+Zeitmessung der einzelnen Phasen von Game.run (Eingaben, Spielschritte, Zeichnen, Anzeigen).
+
+Eingeschaltet wird sie mit 'python main.py profile' (setzt ENABLED). Ist sie aus, hat Game.profiler den
+Wert None und die Spielschleife prüft nur diese eine Variable. Pro Phase werden die letzten WINDOW
+Messungen für Perzentile behalten und alle Messungen in einem Histogramm mit Zweierpotenz-Klassen gezählt.
+"""
+# Standardbibliothek
+from collections import deque
+from typing import Dict, List
+import time
+
+ENABLED = False
+PHASES = ("events", "accept_direction", "apple_logic", "snake_logic", "draw", "present")
+WINDOW = 600 # Messungen pro Phase für die Perzentile
+
+def percentile(values: List[int], fraction: float) -> int:
+    """'values' muss sortiert sein"""
+    if not values:
+        return 0
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+class PhaseProfiler:
+    def __init__(self, phases=PHASES, window: int = WINDOW):
+        self.phases = tuple(phases)
+        self.samples: Dict[str, deque] = {phase: deque(maxlen=window) for phase in self.phases}
+        # Histogramm: Klasse k zählt Messungen mit 2**(k-1) <= ns < 2**k
+        self.histograms: Dict[str, List[int]] = {phase: [0] * 64 for phase in self.phases}
+        self.totals = dict.fromkeys(self.phases, 0) # Summe aller Messungen in ns
+        self.counts = dict.fromkeys(self.phases, 0)
+        self.last = dict.fromkeys(self.phases, 0) # letzte Messung pro Phase
+        self.now = time.perf_counter_ns
+
+    def add(self, phase: str, ns: int) -> None:
+        self.samples[phase].append(ns)
+        self.histograms[phase][min(ns.bit_length(), 63)] += 1
+        self.totals[phase] += ns
+        self.counts[phase] += 1
+        self.last[phase] = ns
+
+    def stats(self, phase: str) -> Dict[str, float]:
+        """Kennzahlen einer Phase in Millisekunden (Perzentile über die letzten WINDOW Messungen)"""
+        values = sorted(self.samples[phase])
+        count = self.counts[phase]
+        return {"count": count,
+                "mean": self.totals[phase] / count / 1e6 if count else 0.0,
+                "p50": percentile(values, 0.5) / 1e6,
+                "p95": percentile(values, 0.95) / 1e6,
+                "p99": percentile(values, 0.99) / 1e6,
+                "max": max(values, default=0) / 1e6}
+
+    def lines(self) -> List[str]:
+        """Eine Textzeile pro Phase, z.B. für das Overlay im Spiel"""
+        lines = []
+        for phase in self.phases:
+            stats = self.stats(phase)
+            lines.append(f"{phase:<16} p50 {stats['p50']:7.3f}  p95 {stats['p95']:7.3f}  "
+                         f"p99 {stats['p99']:7.3f}  max {stats['max']:7.3f} ms")
+        return lines
+
+    def report(self) -> str:
+        """Zusammenfassung mit Histogramm, wird am Ende eines Spiels ausgegeben"""
+        lines = ["Phase            Anzahl  Mittel     p50     p95     p99     max (ms)"]
+        for phase in self.phases:
+            stats = self.stats(phase)
+            lines.append(f"{phase:<16} {stats['count']:6d} {stats['mean']:7.3f} {stats['p50']:7.3f} "
+                         f"{stats['p95']:7.3f} {stats['p99']:7.3f} {stats['max']:7.3f}")
+        for phase in self.phases:
+            buckets = [(index, count) for index, count in enumerate(self.histograms[phase]) if count]
+            if buckets:
+                text = ", ".join(f"<{2 ** index / 1e6:.3g}ms: {count}" for index, count in buckets)
+                lines.append(f"{phase}: {text}")
+        return "\n".join(lines)
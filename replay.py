@@ -0,0 +1,157 @@
+"""
+Wiederholungen (Replays) von Spielen.
+
+Ein Spiel ist durch seinen Startwert, den Spielmodus und die Eingabe pro Schritt vollständig bestimmt,
+deshalb wird pro Schritt nur ein Byte gespeichert. Damit man nicht jedes Mal ab Schritt 0 nachspielen
+muss, wird alle 'interval' Schritte ein Schlüsselbild mit dem Spielstand abgelegt.
+
+Ein Schlüsselbild enthält neben der Schlange den Zustand des Zufallsgenerators und die Reihenfolge der
+freien Felder (FreeCells.cells), denn beide bestimmen, wo der nächste Apfel erscheint. Die laufende Engine
+wird dabei nicht verändert; die Positionen der freien Felder werden erst beim Springen (seek) neu
+berechnet. Weil die Reihenfolge 4 Bytes pro Feld braucht, liegen Schlüsselbilder auf großen Spielfeldern
+weiter auseinander (keyframe_interval).
+
+Dateiformat (little endian):
+    Kopf:            b"SNKR", Version (B), Startwert (Q), Abstand der Schlüsselbilder (I),
+                     Spielmodus (H Länge + UTF-8), Einstellungen (I Länge + JSON)
+    Schritte:        Anzahl (I), dann ein Byte pro Schritt (Richtung 0-3, NO_ACTION = keine Eingabe)
+    Schlüsselbilder: Anzahl (I), pro Schlüsselbild: Schritt (I), Richtung (B), letzte Richtung (B),
+                     Ergebnis des Schritts (B), Apfel (I), Länge (I), Anzahl der freien Felder (I),
+                     die Feldnummern der Schlange ab dem Kopf (I je Feld), der Zustand des
+                     Zufallsgenerators (RNG_STATE mal I) und FreeCells.cells (i je Feld des Spielfelds)
+"""
+# Standardbibliothek
+from array import array
+from bisect import bisect_right
+from typing import List, Optional, Tuple
+import json
+import struct
+
+# lokale Module
+from engine import Engine
+
+MAGIC = b"SNKR"
+VERSION = 2
+KEYFRAME_INTERVAL = 1024 # Schritte zwischen zwei Schlüsselbildern (mindestens)
+KEYFRAME_BYTES_PER_TICK = 64 # Speicher für Schlüsselbilder pro Schritt auf großen Spielfeldern (höchstens)
+NO_ACTION = 4
+RNG_STATE = 625 # Länge des Zustands von random.Random (Mersenne Twister und Position)
+
+_HEADER = struct.Struct("<4sBQI")
+_KEYFRAME = struct.Struct("<IBBBIII")
+
+def keyframe_interval(size) -> int:
+    """Abstand der Schlüsselbilder für ein Spielfeld; ein Schlüsselbild braucht 4 Bytes pro Feld"""
+    if size is None:
+        return KEYFRAME_INTERVAL
+    return max(KEYFRAME_INTERVAL, 4 * size[0] * size[1] // KEYFRAME_BYTES_PER_TICK)
+
+class Replay:
+    def __init__(self, seed: int, mode: str, settings: dict = None, interval: int = None):
+        self.seed = seed
+        self.mode = mode
+        self.settings = {} if settings is None else settings
+        self.interval = interval if interval is not None else keyframe_interval(self.settings.get("size"))
+        self.actions = bytearray()
+        self.keyframes: List[Tuple[int, bytes]] = [] # (Schritt, gepackter Spielstand)
+
+    def __len__(self) -> int:
+        return len(self.actions)
+
+    def record(self, engine: Engine, action: Optional[int]) -> None:
+        """Wird direkt nach jedem Engine.step aufgerufen, 'action' ist die übergebene Richtung"""
+        self.actions.append(NO_ACTION if action is None else action)
+        if engine.ticks % self.interval == 0 and not engine.over:
+            self.keyframes.append((engine.ticks, self._pack(engine)))
+
+    def _pack(self, engine: Engine) -> bytes:
+        """Liest den Spielstand nur aus, die Engine bleibt unverändert"""
+        width = engine.width
+        cells = array("I", (y * width + x for x, y in engine.body))
+        apple = engine.apple[1] * width + engine.apple[0]
+        rng_state = array("I", engine.rng.getstate()[1])
+        return b"".join((_KEYFRAME.pack(engine.ticks, engine.direction, engine.last_direction, engine.status,
+                                        apple, len(cells), engine.free.count),
+                         cells.tobytes(), rng_state.tobytes(), engine.free.cells.tobytes()))
+
+    def _unpack(self, engine: Engine, data: bytes) -> None:
+        ticks, direction, last_direction, status, apple, length, free_count = _KEYFRAME.unpack_from(data)
+        offset = _KEYFRAME.size
+        cells = array("I")
+        cells.frombytes(data[offset:offset + 4 * length])
+        offset += 4 * length
+        rng_state = array("I")
+        rng_state.frombytes(data[offset:offset + 4 * RNG_STATE])
+        offset += 4 * RNG_STATE
+        free = array("i")
+        free.frombytes(data[offset:offset + 4 * engine.width * engine.height])
+        width = engine.width
+        engine.restore([(cell % width, cell // width) for cell in cells], (apple % width, apple // width),
+                       direction, last_direction, ticks, status, free=(free, free_count))
+        engine.rng.setstate((3, tuple(rng_state), None))
+
+    def new_engine(self, engine_class=None) -> Engine:
+        """Erstellt eine Engine im Anfangszustand des aufgenommenen Spiels"""
+        if engine_class is None:
+            from gamemodes import get_gamemodes
+            engine_class = get_gamemodes()[self.mode].gameclass.engine_class
+        return engine_class(tuple(self.settings["size"]), self.seed)
+
+    def advance(self, engine: Engine, ticks: int) -> Engine:
+        """Spielt von engine.ticks aus 'ticks' weitere aufgenommene Schritte nach"""
+        end = min(engine.ticks + ticks, len(self.actions))
+        while engine.ticks < end and not engine.over:
+            action = self.actions[engine.ticks]
+            engine.step(None if action == NO_ACTION else action)
+        return engine
+
+    def seek(self, tick: int, engine_class=None) -> Engine:
+        """Gibt eine Engine im Zustand nach 'tick' Schritten zurück, ausgehend vom letzten Schlüsselbild davor"""
+        engine = self.new_engine(engine_class)
+        index = bisect_right([keyframe[0] for keyframe in self.keyframes], tick)
+        if index > 0:
+            self._unpack(engine, self.keyframes[index - 1][1])
+        return self.advance(engine, tick - engine.ticks)
+
+    def save(self, path: str) -> None:
+        mode = self.mode.encode()
+        settings = json.dumps(self.settings).encode()
+        with open(path, "wb") as file:
+            file.write(_HEADER.pack(MAGIC, VERSION, self.seed, self.interval))
+            file.write(struct.pack("<H", len(mode)) + mode)
+            file.write(struct.pack("<I", len(settings)) + settings)
+            file.write(struct.pack("<I", len(self.actions)) + self.actions)
+            file.write(struct.pack("<I", len(self.keyframes)))
+            for _, data in self.keyframes:
+                file.write(data)
+
+    @classmethod
+    def load(cls, path: str) -> "Replay":
+        with open(path, "rb") as file:
+            data = file.read()
+        magic, version, seed, interval = _HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} ist keine Wiederholung (Version {VERSION})")
+        offset = _HEADER.size
+
+        length, = struct.unpack_from("<H", data, offset)
+        mode = data[offset + 2:offset + 2 + length].decode()
+        offset += 2 + length
+        length, = struct.unpack_from("<I", data, offset)
+        settings = json.loads(data[offset + 4:offset + 4 + length].decode())
+        offset += 4 + length
+
+        replay = cls(seed, mode, settings, interval)
+        cells = settings["size"][0] * settings["size"][1]
+        length, = struct.unpack_from("<I", data, offset)
+        replay.actions = bytearray(data[offset + 4:offset + 4 + length])
+        offset += 4 + length
+
+        count, = struct.unpack_from("<I", data, offset)
+        offset += 4
+        for _ in range(count):
+            ticks, _, _, _, _, length, _ = _KEYFRAME.unpack_from(data, offset)
+            end = offset + _KEYFRAME.size + 4 * (length + RNG_STATE + cells)
+            replay.keyframes.append((ticks, data[offset:end]))
+            offset = end
+        return replay
@@ -1,11 +1,112 @@
+import atexit
 import json
 import os
+import stat
 import sys
-from typing import List, Tuple, Union
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional, Tuple, Union
 
 import pygame_gui
 import pygame
 
+SAVE_DELAY = 0.5 # Sekunden ohne weitere Änderung, bevor gespeichert wird
+MAX_SAVE_DELAY = 2.0 # Spätestens so lange nach der ersten Änderung wird gespeichert
+
+# Die umask lässt sich nur durch Setzen auslesen; einmal beim Import, bevor der Schreib-Thread läuft
+_UMASK = os.umask(0o022)
+os.umask(_UMASK)
+
+def write_atomic(path: str, data: Union[str, bytes]) -> None:
+    """Schreibt zuerst in eine temporäre Datei und ersetzt dann 'path', so bleibt nie eine halbe Datei zurück"""
+    descriptor, temp_path = tempfile.mkstemp(prefix=".", suffix=".tmp", dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        with os.fdopen(descriptor, "wb" if isinstance(data, bytes) else "w") as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        # mkstemp legt die Datei mit 0600 an: Rechte der alten Datei übernehmen, sonst die üblichen (umask)
+        try:
+            mode = stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            mode = 0o666 & ~_UMASK
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+class ConfigWriter:
+    """
+    Speichert Konfigurationsdateien verzögert in einem Hintergrund-Thread. Mehrere Änderungen kurz
+    hintereinander werden zu einem Schreibvorgang zusammengefasst; beim Beenden wird alles geschrieben
+    """
+    def __init__(self, delay: float = SAVE_DELAY, max_delay: float = MAX_SAVE_DELAY):
+        self.delay = delay
+        self.max_delay = max_delay
+        self.pending: Dict[str, Tuple[str, float, float]] = {} # Pfad -> (Text, Fälligkeit, erste Änderung)
+        self.condition = threading.Condition()
+        self.writing = threading.Lock() # Hält flush auf, solange der Thread gerade schreibt
+        self.thread = None
+
+    def schedule(self, path: str, text: str) -> None:
+        """Plant das Schreiben von 'text' nach 'path' ein; ein älterer, noch nicht geschriebener Stand wird ersetzt"""
+        now = time.monotonic()
+        with self.condition:
+            first = self.pending[path][2] if path in self.pending else now
+            self.pending[path] = (text, min(now + self.delay, first + self.max_delay), first)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name="ConfigWriter", daemon=True)
+                self.thread.start()
+            self.condition.notify()
+
+    def write(self, path: str, text: str) -> None:
+        """Schreibt sofort; ein eingeplanter, älterer Stand für 'path' wird verworfen"""
+        with self.writing:
+            with self.condition:
+                self.pending.pop(path, None)
+            write_atomic(path, text)
+
+    def flush(self, path: Optional[str] = None) -> None:
+        """Schreibt sofort alle ausstehenden Änderungen (oder nur die für 'path')"""
+        with self.writing:
+            with self.condition:
+                if path is None:
+                    items = list(self.pending.items())
+                    self.pending.clear()
+                elif path in self.pending:
+                    items = [(path, self.pending.pop(path))]
+                else:
+                    items = []
+            for item_path, (text, _, _) in items:
+                write_atomic(item_path, text)
+
+    def _run(self) -> None:
+        while True:
+            with self.condition:
+                while not self.pending:
+                    self.condition.wait()
+                timeout = min(due for _, due, _ in self.pending.values()) - time.monotonic()
+                if timeout > 0:
+                    self.condition.wait(timeout)
+                    continue # Es könnte inzwischen eine neuere Änderung geben
+            with self.writing:
+                with self.condition:
+                    now = time.monotonic()
+                    items = [(path, item) for path, item in self.pending.items() if item[1] <= now]
+                    for path, _ in items:
+                        del self.pending[path]
+                for path, (text, _, _) in items:
+                    try:
+                        write_atomic(path, text)
+                    except OSError as error:
+                        print(f"Couldn't save {path}: {error}", file=sys.stderr)
+
+writer = ConfigWriter()
+atexit.register(writer.flush)
+
 class Settings:
     def __init__(self, path="gameconfig.json", autosave: bool = False):
         self.path = path
@@ -14,6 +115,7 @@ class Settings:
 
     def load(self) -> bool:
         from gamemodes import get_gamemodes
+        writer.flush(self.path) # Noch nicht gespeicherte Änderungen zuerst schreiben
         with open(self.path, "r") as file:
             self.content = json.load(file)
 
@@ -28,8 +130,17 @@ class Settings:
             self.save()
 
     def save(self) -> None:
-        with open(self.path, "w") as file:
-            json.dump(self.content, file, indent=4)
+        """Speichert sofort"""
+        writer.write(self.path, json.dumps(self.content, indent=4))
+
+    def changed(self) -> None:
+        """Wird nach jeder Änderung aufgerufen; mit autosave wird das Speichern im Hintergrund eingeplant"""
+        if self.autosave:
+            writer.schedule(self.path, json.dumps(self.content, indent=4))
+
+    def flush(self) -> None:
+        """Schreibt eingeplante Änderungen sofort"""
+        writer.flush(self.path)
 
     def copy(self, autosave: bool = False):
         return Settings(self.path, autosave)
@@ -41,8 +152,7 @@ class Settings:
     @gamemode.setter
     def gamemode(self, obj):
         self.content["gamemode"] = obj
-        if self.autosave:
-            self.save()
+        self.changed()
 
     @property
     def size(self) -> List[int]:
@@ -55,8 +165,7 @@ class Settings:
     @size.setter
     def size(self, size: Union[Tuple[int, int], List[int]]):
         self.content["size"] = size
-        if self.autosave:
-            self.save()
+        self.changed()
 
     @property
     def snakespeed(self) -> int:
@@ -65,8 +174,7 @@ class Settings:
     @snakespeed.setter
     def snakespeed(self, obj):
         self.content["snakespeed"] = obj
-        if self.autosave:
-            self.save()
+        self.changed()
 
     @property
     def fps(self) -> int:
@@ -75,8 +183,17 @@ class Settings:
     @fps.setter
     def fps(self, obj):
         self.content["fps"] = obj
-        if self.autosave:
-            self.save()
+        self.changed()
+
+    @property
+    def render_fps(self):
+        """Wie oft pro Sekunde das Spiel höchstens dargestellt wird; None heißt nach jedem Spielschritt"""
+        return self.content.get("render_fps")
+
+    @property
+    def viewport(self):
+        """Größe des sichtbaren Ausschnitts in Feldern; None heißt automatisch (siehe viewport.py)"""
+        return self.content.get("viewport")
 
     @property
     def tilesize(self):
@@ -86,8 +203,7 @@ class Settings:
     def tilesize(self, obj):
         if isinstance(obj, (tuple, list)) and len(obj) == 2:
             self.content["tilesize"] = obj
-            if self.autosave:
-                self.save()
+            self.changed()
 
     @property
     def texturepack(self):
@@ -96,8 +212,7 @@ class Settings:
     @texturepack.setter
     def texturepack(self, name: str):
         self.content["texturepack"] = name
-        if self.autosave:
-            self.save()
+        self.changed()
 
     @property
     def gamemode_settings(self):
@@ -182,8 +297,7 @@ class GameSettings(SubSettings):
     @snakespeedincrease.setter
     def snakespeedincrease(self, obj):
         self.settings.gamemode_settings.get(self.gamemode)["speed_increase"] = obj
-        if self.settings.autosave:
-            self.settings.save()
+        self.settings.changed()
 
 class HeadSwitchSettings(GameSettings):
     gamemode="Kopfwechsel"
@@ -0,0 +1,182 @@
+"""
+Massensimulation ohne Fenster: Spiele werden in Pakete ('shards') aufgeteilt, auf mehrere Prozesse
+verteilt und von einem Controller gespielt. Die Ergebnisse der Pakete werden zusammengefasst,
+sobald sie fertig sind.
+
+Aufruf: python main.py simulate --mode Wandlos --games 100000 --workers 16 --seed 1
+"""
+# Standardbibliothek
+from typing import Callable, Dict, Optional
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+import argparse
+import importlib
+import math
+import os
+import random
+import time
+
+# lokale Module
+from engine import Engine, DELTAS, EMPTY, APPLE, WON, opposite
+from autopilot import HamiltonianController
+
+class RandomController:
+    """Wählt zufällig eine Richtung, in der die Schlange nicht sofort stirbt"""
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+
+    def safe_directions(self, engine: Engine):
+        tail = engine.body[-1]
+        for direction in range(4):
+            if direction == opposite(engine.last_direction):
+                continue
+            x = engine.head[0] + DELTAS[direction][0]
+            y = engine.head[1] + DELTAS[direction][1]
+            if engine.wrap:
+                x %= engine.width
+                y %= engine.height
+            elif not (0 <= x < engine.width and 0 <= y < engine.height):
+                continue
+            if engine.at((x, y)) in (EMPTY, APPLE) or (x, y) == tail:
+                yield direction, x, y
+
+    def __call__(self, engine: Engine) -> Optional[int]:
+        directions = [direction for direction, _, _ in self.safe_directions(engine)]
+        if len(directions) == 0:
+            return None
+        return self.rng.choice(directions)
+
+class GreedyController(RandomController):
+    """Läuft auf dem kürzesten Weg zum Apfel, solange die Schlange dabei nicht sofort stirbt"""
+    def __call__(self, engine: Engine) -> Optional[int]:
+        best = None
+        best_distance = None
+        for direction, x, y in self.safe_directions(engine):
+            dx = abs(x - engine.apple[0])
+            dy = abs(y - engine.apple[1])
+            if engine.wrap:
+                dx = min(dx, engine.width - dx)
+                dy = min(dy, engine.height - dy)
+            if best_distance is None or dx + dy < best_distance:
+                best, best_distance = direction, dx + dy
+        return best
+
+CONTROLLERS: Dict[str, Callable] = {"random": RandomController, "greedy": GreedyController,
+                                    "hamilton": HamiltonianController}
+
+def load_controller(name: str) -> Callable:
+    """Gibt die Controllerklasse zurück; eigene Controller werden als 'modul:Klasse' angegeben"""
+    if name in CONTROLLERS:
+        return CONTROLLERS[name]
+    module, _, attribute = name.partition(":")
+    return getattr(importlib.import_module(module), attribute)
+
+def game_seed(seed: Optional[int], game: int) -> Optional[int]:
+    """Leitet aus dem Startwert der Simulation den Startwert eines einzelnen Spiels ab"""
+    if seed is None:
+        return None
+    return seed * 2**32 + game
+
+def run_shard(mode: str, size, controller_name: str, first_game: int, games: int, seed: Optional[int],
+              max_ticks: int) -> dict:
+    """Spielt die Spiele first_game bis first_game+games-1 und gibt deren Zusammenfassung zurück"""
+    from gamemodes import get_gamemodes
+    engine = get_gamemodes()[mode].gameclass.engine_class(size)
+    controller = load_controller(controller_name)(game_seed(seed, first_game))
+
+    scores = Counter()
+    ticks = wins = timeouts = 0
+    started = time.perf_counter()
+    for game in range(first_game, first_game + games):
+        engine.reset(game_seed(seed, game))
+        step = engine.step
+        while not engine.over and engine.ticks < max_ticks:
+            step(controller(engine))
+        scores[engine.score] += 1
+        ticks += engine.ticks
+        wins += engine.status == WON
+        timeouts += not engine.over
+    return {"games": games, "scores": scores, "ticks": ticks, "wins": wins, "timeouts": timeouts,
+            "seconds": time.perf_counter() - started}
+
+def default_shard_size(games: int, workers: int) -> int:
+    """Teilt die Spiele so auf, dass jeder Prozess etwa vier Pakete bekommt (gleicht Laufzeitunterschiede aus)"""
+    return max(1, math.ceil(games / (workers * 4)))
+
+def percentile(counts: Counter, fraction: float) -> int:
+    """Gibt den Wert zurück, unter dem 'fraction' aller Einträge liegen"""
+    limit = fraction * sum(counts.values())
+    seen = 0
+    for value in sorted(counts):
+        seen += counts[value]
+        if seen >= limit:
+            return value
+    return 0
+
+def simulate(mode: str, size, games: int, workers: int, seed: Optional[int], controller: str,
+             shard_size: int, max_ticks: int) -> dict:
+    """Verteilt die Spiele auf 'workers' Prozesse und fasst die Ergebnisse der Pakete zusammen"""
+    total = {"games": 0, "scores": Counter(), "ticks": 0, "wins": 0, "timeouts": 0, "seconds": 0.0}
+    shards = ((first, min(shard_size, games - first)) for first in range(0, games, shard_size))
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        running = set()
+        while True:
+            # Es werden nur so viele Pakete eingereiht, wie gerade bearbeitet werden können
+            for first, count in shards:
+                running.add(executor.submit(run_shard, mode, size, controller, first, count, seed, max_ticks))
+                if len(running) >= 2 * workers:
+                    break
+            if not running:
+                break
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                for key in ("games", "ticks", "wins", "timeouts", "seconds"):
+                    total[key] += result[key]
+                total["scores"].update(result["scores"])
+            print(f"\r{total['games']}/{games} Spiele", end="", flush=True)
+    print()
+    total["wall_seconds"] = time.perf_counter() - started
+    return total
+
+def report(total: dict) -> None:
+    scores = total["scores"]
+    games = max(total["games"], 1)
+    mean = sum(score * count for score, count in scores.items()) / games
+    print(f"Spiele: {total['games']}  gewonnen: {total['wins']}  abgebrochen: {total['timeouts']}")
+    print(f"Punkte: Durchschnitt {mean:.2f}, min {min(scores, default=0)}, p50 {percentile(scores, 0.5)}, "
+          f"p90 {percentile(scores, 0.9)}, p99 {percentile(scores, 0.99)}, max {max(scores, default=0)}")
+    print(f"Spiellänge: {total['ticks'] / games:.1f} Schritte im Durchschnitt")
+    print(f"Schritte pro Sekunde: {total['ticks'] / max(total['wall_seconds'], 1e-9):,.0f} gesamt, "
+          f"{total['ticks'] / max(total['seconds'], 1e-9):,.0f} pro Prozess")
+
+def main(args=None) -> None:
+    from gamemodes import get_gamemodes
+    from settings import Settings
+    settings = Settings()
+    gamemodes = get_gamemodes()
+
+    parser = argparse.ArgumentParser(prog="main.py simulate", description="Spielt viele Spiele ohne Fenster")
+    parser.add_argument("--mode", default=settings.gamemode, choices=list(gamemodes.keys()), help="Spielmodus")
+    parser.add_argument("--size", default=None, help="Spielfeldgröße als BREITExHÖHE (Standard: aus gameconfig.json)")
+    parser.add_argument("--games", type=int, default=1000, help="Anzahl der Spiele")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Anzahl der Prozesse")
+    parser.add_argument("--seed", type=int, default=None, help="Startwert für reproduzierbare Spiele")
+    parser.add_argument("--controller", default="greedy",
+                        help=f"{', '.join(CONTROLLERS)} oder 'modul:Klasse'")
+    parser.add_argument("--shard-size", type=int, default=None,
+                        help="Spiele pro Paket (Standard: etwa vier Pakete pro Prozess)")
+    parser.add_argument("--max-ticks", type=int, default=None,
+                        help="Abbruch eines Spiels nach so vielen Schritten (Standard: 100 x Felder)")
+    args = parser.parse_args(args)
+
+    size = settings.size if args.size is None else [int(value) for value in args.size.lower().split("x")]
+    max_ticks = args.max_ticks if args.max_ticks is not None else 100 * size[0] * size[1]
+    shard_size = args.shard_size if args.shard_size is not None else default_shard_size(args.games, args.workers)
+    total = simulate(args.mode, tuple(size), args.games, args.workers, args.seed, args.controller,
+                     shard_size, max_ticks)
+    report(total)
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,11 @@
 # Standardbibliothek
-from typing import Dict, List, Tuple
+from typing import Deque, Dict, Optional, Tuple
 from enum import Enum, auto
+from collections import deque
+from itertools import islice
+import hashlib
+import mmap
 import os
-from glob import iglob
 
 # externe Bibliothek
 import pygame
@@ -19,13 +22,22 @@ from pygame.locals import (
   )
 
 # lokale Module
-from settings import Settings
+from settings import Settings, write_atomic
+from atlas import TextureAtlas, edge_key
 #from main import TILE_SIZE
 
 # KONSTANTEN (hier sind es Farben)
 MAINCOLOR = THECOLORS.get("darkgreen")
 EDGECOLOR = THECOLORS.get("green")
 
+TEXTURES_DIRECTORY = "textures"
+TEXTURE_CACHE = "__texturecache__" # Unterordner eines Texturpakets mit den fertig skalierten Texturen
+CACHE_VERSION = 1
+CACHE_SIZES = 4 # So viele Größen einer Textur bleiben höchstens zwischengespeichert
+
+# pygame.image.tostring heißt ab pygame 2.1.3 tobytes
+_tobytes = getattr(pygame.image, "tobytes", None) or pygame.image.tostring
+
 class Direction(Enum):
     UP = auto()
     RIGHT = auto()
@@ -46,18 +58,31 @@ class Direction(Enum):
         else:
             raise Exception("Es wurde keine Richtung ('Direction') gegeben")
 
+    @property
+    def index(self) -> int:
+        """Gibt die Richtung als ganze Zahl zurück, wie sie die Engine nutzt (engine.UP, ...)"""
+        return self.value - 1
+
+    @staticmethod
+    def from_index(index: int) -> "Direction":
+        return Direction(index + 1)
+
 class TexturePack:
     def __init__(self, folder, settings: Settings):
         pygame.display.init()
         self._settings = settings
         self.folder = folder
         self._textures: Dict[str, pygame.Surface] = {}
+        # Kopf und Körper mit allen 16 Kantenkombinationen, siehe with_edges
+        self._edged: Dict[Tuple[str, int], pygame.Surface] = {}
+        self.atlas: Optional[TextureAtlas] = None # Alle Kacheltexturen in einem Surface, siehe atlas.py
         self.drawbackground = None
 
         self.snakeedge_height = 1
 
-        self._load()
-        self.rescale(self._settings.tilesize)
+        self._load() # Die Texturen haben danach schon die richtige Größe
+        self._create_edge_cache()
+        self.atlas = TextureAtlas.from_texturepack(self)
 
     @property
     def name(self):
@@ -65,25 +90,95 @@ class TexturePack:
 
     @staticmethod
     def texturpacks():
-        return [os.path.basename(folder) for folder in iglob("textures\\*")]
+        if not os.path.isdir(TEXTURES_DIRECTORY):
+            return []
+        return [name for name in sorted(os.listdir(TEXTURES_DIRECTORY))
+                if os.path.isdir(os.path.join(TEXTURES_DIRECTORY, name))]
+
+    def _cache_path(self, filename: str, size: Tuple[int, int]) -> str:
+        """
+        Gibt den Pfad der zwischengespeicherten Textur zurück. Der Name enthält einen Hash aus
+        Texturpaket, Datei, Änderungszeit und Zielgröße, eine geänderte PNG-Datei wird also neu geladen
+        """
+        stat = os.stat(filename)
+        key = f"{CACHE_VERSION}|{self.folder}|{os.path.basename(filename)}|{stat.st_mtime_ns}|{stat.st_size}|{size[0]}x{size[1]}"
+        digest = hashlib.sha1(key.encode()).hexdigest()[:16]
+        basename = os.path.splitext(os.path.basename(filename))[0]
+        return os.path.join(os.path.dirname(filename), TEXTURE_CACHE, f"{basename}-{size[0]}x{size[1]}-{digest}.rgba")
+
+    @staticmethod
+    def _evict(cache_path: str) -> None:
+        """
+        Entfernt veraltete Einträge derselben Textur und Größe (andere Quelldatei) sowie die am längsten
+        nicht benutzten Einträge anderer Größen, sodass mit 'cache_path' höchstens CACHE_SIZES übrig bleiben
+        """
+        directory, name = os.path.split(cache_path)
+        texture, size, _ = name.rsplit("-", 2)
+        entries = [] # (Änderungszeit, Pfad) der Einträge anderer Größen
+        for other in os.listdir(directory):
+            if not other.endswith(".rgba") or other == name:
+                continue
+            path = os.path.join(directory, other)
+            if other.rsplit("-", 1)[0] == texture: # Name ohne Größe aus älteren Versionen
+                os.remove(path)
+                continue
+            if other.count("-") < 2:
+                continue
+            other_texture, other_size, _ = other.rsplit("-", 2)
+            if other_texture != texture:
+                continue
+            if other_size == size:
+                os.remove(path)
+            else:
+                entries.append((os.path.getmtime(path), path))
+        entries.sort()
+        for _, path in entries[:max(0, len(entries) - (CACHE_SIZES - 1))]:
+            os.remove(path)
+
+    def _load_picture(self, filename: str, size: Tuple[int, int]) -> pygame.Surface:
+        """
+        Lädt eine PNG-Datei in der Größe 'size'. Die fertig skalierten Pixel werden als rohe RGBA-Daten
+        zwischengespeichert; beim nächsten Start werden sie per mmap gelesen, ohne PNG-Dekodierung und Skalierung
+        """
+        size = (int(size[0]), int(size[1]))
+        cache_path = self._cache_path(filename, size)
+        if os.path.isfile(cache_path) and os.path.getsize(cache_path) == size[0] * size[1] * 4:
+            with open(cache_path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                raw = pygame.image.frombuffer(buffer, size, "RGBA")
+                picture = raw.convert_alpha() # Kopiert die Pixel, danach wird die Datei nicht mehr gebraucht
+                del raw
+            try:
+                os.utime(cache_path) # Zuletzt benutzt, siehe _evict
+            except OSError:
+                pass
+            return picture
+
+        picture = pygame.transform.scale(pygame.image.load(filename).convert_alpha(), size)
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            self._evict(cache_path)
+            write_atomic(cache_path, _tobytes(picture, "RGBA"))
+        except OSError: # z.B. schreibgeschützter Ordner; dann wird eben jedes Mal neu geladen
+            pass
+        return picture
 
     def _load(self):
         import importlib
         from types import MethodType
-        path_to_files = f"textures\\{self.folder}\\"
-        for filename in iglob(f"{path_to_files}*.png"):
-            basename = os.path.basename(filename)[:-4].upper()
-            with open(filename) as file:
-                picture = pygame.image.load(file)
+        path_to_files = os.path.join(TEXTURES_DIRECTORY, self.folder)
+        for name in sorted(os.listdir(path_to_files)):
+            if not name.lower().endswith(".png"):
+                continue
+            basename = name[:-4].upper() # [:-4] entfernt .png
             if basename == "SNAKEEDGE":
-                picture = pygame.transform.scale(picture.convert_alpha(), (self._settings.tilesize[0], self.snakeedge_height))
+                size = (self._settings.tilesize[0], self.snakeedge_height)
             else:
-                picture = pygame.transform.scale(picture.convert_alpha(), self._settings.tilesize)
-            self._textures[basename] = picture # [:-4] entfernt .png
+                size = self._settings.tilesize
+            self._textures[basename] = self._load_picture(os.path.join(path_to_files, name), size)
 
-        if os.path.exists(f"{path_to_files}background.py"):
+        if os.path.exists(os.path.join(path_to_files, "background.py")):
             # background.py wird geladen
-            module_path = os.path.abspath(f"{path_to_files}background.py")
+            module_path = os.path.abspath(os.path.join(path_to_files, "background.py"))
             spec = importlib.util.spec_from_file_location("background", module_path)
             background = importlib.util.module_from_spec(spec)
             spec.loader.exec_module(background)
@@ -93,9 +188,16 @@ class TexturePack:
         if self.drawbackground is None:
             self.drawbackground = self._default_drawbackground
 
-        self._textures["BACKGROUND"] = self.drawbackground()
-
     def _default_drawbackground(self) -> pygame.Surface:
+        surface = pygame.Surface(self._settings.realsize)
+        self.draw_tiles(surface, 0, 0, *self._settings.size)
+        return surface
+
+    def draw_tiles(self, surface: pygame.Surface, first_column: int, first_row: int, columns: int, rows: int) -> None:
+        """
+        Zeichnet das Schachbrettmuster der Felder ab Feld (first_column, first_row) oben links in 'surface'.
+        Wird auch für die Hintergrundstücke im Ausschnitt genutzt (siehe viewport.py)
+        """
         if "BACKGROUND1" in self._textures.keys() and "BACKGROUND2" in self._textures.keys():
             draw1 = lambda surface, rect: surface.blit(self._textures["BACKGROUND1"], rect)
             draw2 = lambda surface, rect: surface.blit(self._textures["BACKGROUND2"], rect)
@@ -105,30 +207,41 @@ class TexturePack:
             draw2 = lambda surface, rect: pygame.draw.rect(surface, THECOLORS.get("black"),
                              rect)
 
-        surface = pygame.Surface(self._settings.realsize)
-        for i in range(self._settings.size[0]): # x-Achse
-            for ii in range(self._settings.size[1]): # y-Achse
-                rect = pygame.Rect(i * self._settings.tilesize[0], ii * self._settings.tilesize[1], *self._settings.tilesize)
-                if (i % 2 == 0 and ii % 2 == 0) or (i % 2 != 0 and ii % 2 != 0):
+        tilesize = self._settings.tilesize
+        for i in range(columns): # x-Achse
+            for ii in range(rows): # y-Achse
+                rect = pygame.Rect(i * tilesize[0], ii * tilesize[1], *tilesize)
+                if (first_column + i + first_row + ii) % 2 == 0:
                     draw1(surface, rect)
                 else:
                     draw2(surface, rect)
-        return surface
 
     def rescale(self, scale: Tuple[int, int]):
+        self._textures.pop("BACKGROUND", None) # Wird bei Bedarf neu gezeichnet
         for name, surface in self._textures.items():
             if name == "SNAKEEDGE":
                 self._textures[name] = pygame.transform.scale(surface, (scale[0], self.snakeedge_height))
             else:
                 self._textures[name] = pygame.transform.scale(surface, scale)
-        self._textures["BACKGROUND"] = self.drawbackground()
+        self._create_edge_cache()
+        self.atlas = TextureAtlas.from_texturepack(self)
+
+    def _create_edge_cache(self):
+        """Berechnet alle 16 Kantenkombinationen für Kopf und Körper einmal im Voraus"""
+        self._edged.clear()
+        for name in ("SNAKEHEAD", "SNAKEBODY"):
+            if name not in self._textures.keys():
+                continue
+            for mask in range(16):
+                self._edged[name, mask] = self.create_edges(self._textures[name].copy(), bool(mask & 1),
+                                                            bool(mask & 2), bool(mask & 4), bool(mask & 8))
 
 
     def isfull(self):
-        for surf_name in ("APPLE", "SNAKEHEAD", "SNAKEHEAD", "SNAKEEDGE", "BACKGROUND"):
+        for surf_name in ("APPLE", "SNAKEHEAD", "SNAKEHEAD", "SNAKEEDGE"):
             if surf_name not in self._textures.keys():
                 return False
-        return True
+        return self.drawbackground is not None
 
     def create_edges(self, surf: pygame.Surface, top=True, right=True, bottom=True, left=True) -> pygame.Surface:
         if top:
@@ -141,6 +254,17 @@ class TexturePack:
             surf.blit(pygame.transform.rotate(self.snakeedge, 90), (0, 0, 0, self._settings.tilesize[1]-self.snakeedge_height))
         return surf
 
+    def with_edges(self, name: str, top=True, right=True, bottom=True, left=True) -> pygame.Surface:
+        """
+        Gibt die Textur 'name' ("SNAKEHEAD" oder "SNAKEBODY") mit den gewünschten Kanten zurück.
+        Die Oberfläche wird von allen Nutzern geteilt und darf nicht verändert werden
+        """
+        return self._edged[name, top | right << 1 | bottom << 2 | left << 3]
+
+    def edge_area(self, name: str, top=True, right=True, bottom=True, left=True) -> pygame.Rect:
+        """Gibt den Bereich der Textur aus with_edges im Atlas zurück"""
+        return self.atlas.rects[edge_key(name, top | right << 1 | bottom << 2 | left << 3)]
+
     @property
     def apple(self):
         return self._textures.get("APPLE")
@@ -159,6 +283,9 @@ class TexturePack:
 
     @property
     def background(self):
+        """Hintergrund des ganzen Spielfelds; wird erst beim ersten Zugriff gezeichnet (große Spielfelder nutzen viewport.py)"""
+        if "BACKGROUND" not in self._textures:
+            self._textures["BACKGROUND"] = self.drawbackground()
         return self._textures.get("BACKGROUND")
 
 class Apple(pygame.sprite.Sprite):
@@ -169,6 +296,7 @@ class Apple(pygame.sprite.Sprite):
         #self.surf.fill(THECOLORS.get("red"))
         self.rect = self.texturepack.apple.get_rect()
         self.rect.topleft = position
+        self.area = self.texturepack.atlas.rects["APPLE"] # Bereich im Texturatlas
 
     def draw(self, surface: pygame.Surface):
         surface.blit(self.texturepack.apple, self.rect)
@@ -181,17 +309,23 @@ class SnakeHead(pygame.sprite.Sprite):
     def __init__(self, texturepack: TexturePack):
         super(SnakeHead, self).__init__()
         self.texturepack = texturepack
-        self.surf = self.texturepack.snakehead
+        self.surf = self.texturepack.with_edges("SNAKEHEAD", False, False, False, False)
+        self.area = self.texturepack.edge_area("SNAKEHEAD", False, False, False, False) # Bereich im Texturatlas
 
         self.rect = self.surf.get_rect() # Die Schlange startet oben links
         self.direction = Direction.RIGHT
         self._lastdirection = self.direction
         self.edges = {"top":True, "right":True, "bottom":True, "left":True} # Welche Kanten gezeichnet werden soll
-        self.tails: List[Tail] = [] # Der Schlangenschwanz
+        self.tails: Deque[Tail] = deque() # Der Schlangenschwanz, tails[0] sitzt direkt hinter dem Kopf
 
         # Gruppen
         self.tail_group = None
         self.all_group = None
+        self.pool = [] # Nicht genutzte Tail-Objekte, die beim Wachsen wiederverwendet werden
+
+        # Für die Darstellung: veränderte Objekte und frei gewordene Felder (siehe Game.draw_dirty)
+        self.dirty_sprites = set()
+        self.dirty_rects = []
 
     def draw(self, surface: pygame.Surface):
         surface.blit(self.surf, self.rect)
@@ -199,26 +333,19 @@ class SnakeHead(pygame.sprite.Sprite):
     def rescale(self, size: Tuple[int, int]):
         self.surf = pygame.transform.scale(self.surf, size)
 
-    def next_pos(self, move_value: Tuple[int, int] = (20, 20)) -> pygame.sprite.Sprite:
-        """Gibt die nächste Position der Schlange als Sprite Objekt zurück"""
-        move_x = 0
-        move_y = 0
-        if self.direction == Direction.RIGHT:
-            move_x = move_value[0]
-        elif self.direction == Direction.LEFT:
-            move_x = -move_value[0]  # moves left
-        elif self.direction == Direction.UP:
-            move_y = -move_value[1]
-        elif self.direction == Direction.DOWN:
-            move_y = move_value[1]  # moves Down
-
-        sprite = pygame.sprite.Sprite() # sprite dient als dummy
-        sprite.rect = self.rect.move(move_x, move_y)
-        return sprite
+    def reset(self) -> None:
+        """Setzt die Schlange an den Start zurück; die Schwanzteile kommen in den Vorrat"""
+        for tail in self.tails:
+            tail.kill() # Entfernt das Tail-Objekt aus allen Gruppen
+        self.pool.extend(self.tails)
+        self.tails.clear()
+        self.rect.topleft = (0, 0) # Die Schlange startet oben links
+        self.direction = self._lastdirection = Direction.RIGHT
 
     def make_surf(self, top=True, right=True, bottom=True, left=True) -> None: # Generiert die Darstellung für den Schlangenkopf
         self.edges = {"top": top, "right": right, "bottom": bottom, "left": left}
-        self.surf = self.texturepack.create_edges(self.texturepack.snakehead, top, right, bottom, left)
+        self.surf = self.texturepack.with_edges("SNAKEHEAD", top, right, bottom, left)
+        self.area = self.texturepack.edge_area("SNAKEHEAD", top, right, bottom, left)
 
     def accept_direction(self, pressed_keys: dict) -> None:
         """Überprüft die übergebenen gedrückten Knöpfe und ändert gegebenenfalls die Richtung der Schlange"""
@@ -231,32 +358,47 @@ class SnakeHead(pygame.sprite.Sprite):
         if (pressed_keys[K_RIGHT] or pressed_keys[K_d]) and self._lastdirection != Direction.LEFT:
             self.direction = Direction.RIGHT
 
-    def update(self, collide_with_apple: bool = False, texture: bool = True) -> None:
-        self._lastdirection = self.direction  # verhindert illegale Bewegung
-        old_topleft = self.rect.topleft
-
-        # Schlangenkopf wird bewegt
-        next_pos_rect = self.next_pos(self.texturepack._settings.tilesize).rect  # Bewegt 'rect'
-        self.rect.update(next_pos_rect.left, next_pos_rect.top, self.rect.width, self.rect.height)
-
-        if collide_with_apple:  # Fügt das Tail objekt hinzu; Die Position entspricht die der alten Schlangenkopfposition
-            tail = Tail(old_topleft, self.direction, self.texturepack)
-            self.tails.insert(0, tail)
-            self.tail_group.add(tail)
-            self.all_group.add(tail)
-
-        else:  # Alle Tails werden bewegt
-            old_directions = []
-            for tail in self.tails:
-                tail.update() # Bewegt das Tail objekt
-                old_directions.append(tail.direction)
-            old_directions.insert(0, self.direction) # Fügt den Kopf hinzu
-            old_directions.pop() # Entfernt das letzte Element, da es nicht gebraucht wird
-            for tail, old_direction in zip(self.tails, old_directions):
-                tail.direction = old_direction
+    def update(self, engine, full: bool = False, settings: Settings = None, texture: bool = True) -> None:
+        """
+        Übernimmt die Positionen und die Richtung der Schlange aus der Engine.
+        Bei einem normalen Schritt wandert nur das hinterste Schwanzteil an die Stelle hinter dem Kopf,
+        wächst die Schlange, kommt dort ein neues hinzu. Mit 'full' werden alle Positionen übernommen
+        (z.B. wenn sich die Reihenfolge beim Kopftausch umdreht)
+        """
+        tilesize = self.texturepack._settings.tilesize
+        body = engine.body
+        old_rect = self.rect.copy()
+        self.rect.topleft = (body[0][0] * tilesize[0], body[0][1] * tilesize[1])
+        self.direction = self._lastdirection = Direction.from_index(engine.direction)
+        self.dirty_sprites.add(self)
+
+        if len(body) > 1:
+            neck = (body[1][0] * tilesize[0], body[1][1] * tilesize[1])
+            if len(self.tails) < len(body) - 1: # Die Schlange ist gewachsen
+                if self.pool:
+                    tail = self.pool.pop()
+                    tail.rect.topleft = neck
+                else:
+                    tail = Tail(neck, self.texturepack)
+                self.tail_group.add(tail)
+                self.all_group.add(tail)
+            else:
+                tail = self.tails.pop()
+                self.dirty_rects.append(tail.rect.copy())
+                tail.rect.topleft = neck
+            self.tails.appendleft(tail)
+            self.dirty_sprites.add(tail)
+            self.dirty_sprites.add(self.tails[-1])
+        else:
+            self.dirty_rects.append(old_rect)
+
+        if full:
+            for tail, cell in zip(self.tails, islice(body, 1, None)):
+                tail.rect.topleft = (cell[0] * tilesize[0], cell[1] * tilesize[1])
+            self.dirty_sprites.update(self.tails)
 
         if texture:
-            self.texture(full=collide_with_apple)
+            self.texture(settings, full)
 
     def texture(self, settings: Settings = None, full: bool = False):
         if len(self.tails) == 0:
@@ -281,127 +423,84 @@ class SnakeHead(pygame.sprite.Sprite):
             self.tails[0].make_surf(top, right, bottom, left)
             return
 
-        tails = [self, *self.tails]
-        last = len(self.tails)-1 # Index des Letzten Schwanzteils
-        for index in range(len(self.tails)-1, -1, -1): # iteriert Rückwärts über die Indexe
-            if full or index in {0, last}:
-                self._full_render(tails, self.tails[index], index+1, settings)
-            else:
-                # Die neue Textur entspricht die des vorangegangenen Objektes
-                self.tails[index].make_surf(**self.tails[index-1].edges)
+        if full: # Die Form der Schlange hat sich verändert, z.B. beim Kopftausch
+            segments = [self, *self.tails]
+            for index in range(1, len(segments)):
+                following = segments[index + 1] if index + 1 < len(segments) else None
+                self._full_render(segments[index], segments[index - 1], following, settings)
+        else:
+            # Die Schwanzteile behalten bei einem Schritt und beim Wachsen ihre Position und ihre
+            # Nachbarn, nur das Teil hinter dem Kopf und das letzte Teil bekommen neue (O(1))
+            self._full_render(self.tails[0], self, self.tails[1], settings)
+            self._full_render(self.tails[-1], self.tails[-2], None, settings)
 
-    def _full_render(self, tails: List["Tail"], tail: "Tail", index: int, settings: Settings = None):
-        """Generiert die Textur für ein bestimmtes Tail Objekt"""
+    def _full_render(self, tail: "Tail", previous: pygame.sprite.Sprite, following: Optional["Tail"], settings: Settings = None):
+        """Generiert die Textur für ein bestimmtes Tail Objekt anhand seines Vorgängers und Nachfolgers"""
         top = bottom = left = right = True
         tilesize = self.texturepack._settings.tilesize
         realsize = self.texturepack._settings.realsize
 
         # Überprüft in welcher Richtung das vorangegangene Tail-Objekt relativ zum jetzigen ist
-        if (tail.rect.topleft[0] - tilesize[0] == tails[index - 1].rect.topleft[0]):
+        if (tail.rect.topleft[0] - tilesize[0] == previous.rect.topleft[0]):
             left = False
-        elif (tail.rect.topleft[0] + tilesize[0] == tails[index - 1].rect.topleft[0]):
+        elif (tail.rect.topleft[0] + tilesize[0] == previous.rect.topleft[0]):
             right = False
-        elif (tail.rect.topleft[1] - tilesize[1] == tails[index - 1].rect.topleft[1]):
+        elif (tail.rect.topleft[1] - tilesize[1] == previous.rect.topleft[1]):
             top = False
-        elif (tail.rect.topleft[1] + tilesize[1] == tails[index - 1].rect.topleft[1]):
+        elif (tail.rect.topleft[1] + tilesize[1] == previous.rect.topleft[1]):
             bottom = False
-        if index + 1 < len(tails):
+        if following is not None:
             # Überprüft in welcher Richtung das nächste Tail-Objekt relativ zum jetzigen ist
-            if tail.rect.topleft[0] - tilesize[0] == tails[index + 1].rect.topleft[0]:
+            if tail.rect.topleft[0] - tilesize[0] == following.rect.topleft[0]:
                 left = False
-            elif tail.rect.topleft[0] + tilesize[0] ==  tails[index + 1].rect.topleft[0]:
+            elif tail.rect.topleft[0] + tilesize[0] ==  following.rect.topleft[0]:
                 right = False
-            elif tail.rect.topleft[1] - tilesize[1] == tails[index + 1].rect.topleft[1]:
+            elif tail.rect.topleft[1] - tilesize[1] == following.rect.topleft[1]:
                 top = False
-            elif tail.rect.topleft[1] + tilesize[1] == tails[index + 1].rect.topleft[1]:
+            elif tail.rect.topleft[1] + tilesize[1] == following.rect.topleft[1]:
                 bottom = False
 
         if settings is not None: # ist wichtig für den Wandlos Spielmodus
-            if index+1 < len(tails) and tail.rect.topleft[0] == 0 and tails[index+1].rect.topleft[0] == realsize[0]-tilesize[0]:
+            if following is not None and tail.rect.topleft[0] == 0 and following.rect.topleft[0] == realsize[0]-tilesize[0]:
                 left = False
-            elif index+1 < len(tails) and tail.rect.topleft[0] == realsize[0]-tilesize[0] and tails[index+1].rect.topleft[0] == 0:
+            elif following is not None and tail.rect.topleft[0] == realsize[0]-tilesize[0] and following.rect.topleft[0] == 0:
                 right = False
-            elif tail.rect.topleft[0] == realsize[0]-tilesize[0] and tails[index-1].rect.topleft[0] == 0:
+            elif tail.rect.topleft[0] == realsize[0]-tilesize[0] and previous.rect.topleft[0] == 0:
                 right = False
-            elif tail.rect.topleft[0] == 0 and tails[index-1].rect.topleft[0] == realsize[0]-tilesize[0]:
+            elif tail.rect.topleft[0] == 0 and previous.rect.topleft[0] == realsize[0]-tilesize[0]:
                 left = False
-            elif index+1 < len(tails) and tail.rect.topleft[1] == 0 and tails[index+1].rect.topleft[1] == realsize[1]-tilesize[1]:
+            elif following is not None and tail.rect.topleft[1] == 0 and following.rect.topleft[1] == realsize[1]-tilesize[1]:
                 top = False
-            elif index+1 < len(tails) and tail.rect.topleft[1] == realsize[1]-tilesize[1] and tails[index+1].rect.topleft[1] == 0:
+            elif following is not None and tail.rect.topleft[1] == realsize[1]-tilesize[1] and following.rect.topleft[1] == 0:
                 bottom = False
-            elif tail.rect.topleft[1] == realsize[1]-tilesize[1] and tails[index-1].rect.topleft[1] == 0:
+            elif tail.rect.topleft[1] == realsize[1]-tilesize[1] and previous.rect.topleft[1] == 0:
                 bottom = False
-            elif tail.rect.topleft[1] == 0 and tails[index-1].rect.topleft[1] == realsize[1]-tilesize[1]:
+            elif tail.rect.topleft[1] == 0 and previous.rect.topleft[1] == realsize[1]-tilesize[1]:
                 top = False
 
         tail.make_surf(top, right, bottom, left)
 
-    def add_tail(self, tail):
-        self.tails.append(tail)
-
-    def update_direction(self): # Funktioniert nicht im Wandlosspielmodus (braucht es auch nicht)
-        """Generiert die Richtungen für die Schlange und die Tails basierend auf ihren Positionen"""
-        snake_rect = self.rect
-        next_taile_rect = self.tails[0].rect
-
-        if snake_rect.x > next_taile_rect.x:
-            self.direction = Direction.RIGHT
-            self._lastdirection = Direction.invert(Direction.RIGHT)  # kann man auch direkt Direction.LEFT hinschreiben
-        elif snake_rect.x < next_taile_rect.x:
-            self.direction = Direction.LEFT
-            self._lastdirection = Direction.invert(Direction.LEFT)
-        elif snake_rect.y > next_taile_rect.y:
-            self.direction = Direction.DOWN
-            self._lastdirection = Direction.invert(Direction.UP)
-        elif snake_rect.y < next_taile_rect.y:
-            self.direction = Direction.UP
-            self._lastdirection = Direction.invert(Direction.DOWN)
-
-        old_topleft = self.rect.topleft
-        for index, tail in enumerate(self.tails):
-            if old_topleft[0] > tail.rect.topleft[0]:  # Vorherige Position ist weiter rechts
-                tail.direction = Direction.RIGHT
-            elif old_topleft[0] < tail.rect.topleft[0]: # Vorherige Position ist weiter links
-                tail.direction = Direction.LEFT
-            elif old_topleft[1] > tail.rect.topleft[1]:  # Vorherige Position ist weiter unten
-                tail.direction = Direction.DOWN
-            else: # Vorherige Position ist weiter oben
-                tail.direction = Direction.UP
-            old_topleft = tail.rect.topleft
-
 
 class Tail(pygame.sprite.Sprite):
-    def __init__(self, position: tuple, direction: Direction, texturepack: TexturePack):
+    def __init__(self, position: tuple, texturepack: TexturePack):
         super(Tail, self).__init__()
         self.texturepack = texturepack
-        self.surf = self.texturepack.snakebody
+        self.surf = self.texturepack.with_edges("SNAKEBODY", False, False, False, False)
+        self.area = self.texturepack.edge_area("SNAKEBODY", False, False, False, False) # Bereich im Texturatlas
         self.rect = self.surf.get_rect()
         self.rect.topleft = position
 
-        self.direction = direction
-
     def draw(self, surface: pygame.Surface):
         surface.blit(self.surf, self.rect)
 
     def rescale(self, size: Tuple[int, int]):
         self.surf = pygame.transform.scale(self.surf, size)
 
-    def update(self):
-        # Bewegt sich
-        step = self.texturepack._settings.tilesize
-        if self.direction == Direction.UP:
-            self.rect.move_ip(0, -step[1])
-        elif self.direction == Direction.RIGHT:
-            self.rect.move_ip(step[0], 0)
-        elif self.direction == Direction.DOWN:
-            self.rect.move_ip(0, step[1])
-        elif self.direction == Direction.LEFT:
-            self.rect.move_ip(-step[0], 0)
-
     def make_surf(self, top=True, right=True, bottom=True, left=True):
         """Erstellt die Textur"""
         self.edges = {"top": top, "right": right, "bottom": bottom, "left": left}
-        self.surf = self.texturepack.create_edges(self.texturepack.snakebody, top, right, bottom, left)
+        self.surf = self.texturepack.with_edges("SNAKEBODY", top, right, bottom, left)
+        self.area = self.texturepack.edge_area("SNAKEBODY", top, right, bottom, left)
 
 if __name__ == "__main__":
     pygame.display.set_mode((100, 100))
@@ -0,0 +1,112 @@
+"""
+Telemetrie für den Debug-Modus, ohne das Spiel auszubremsen.
+
+- Log-Meldungen gehen unformatiert über einen logging.QueueHandler (RawQueueHandler); formatiert und
+  geschrieben werden sie von einem QueueListener in seinem eigenen Thread (queue_file_handler).
+- Pro Spielschritt wird nur ein Tupel in einen Ringpuffer gelegt (Telemetry.record). Ein
+  Hintergrund-Thread packt die Einträge binär in eine Datei. Läuft der Puffer über, gehen die ältesten
+  Einträge verloren und werden gezählt, das Spiel wartet aber nie auf die Festplatte.
+
+Dateiformat eines Eintrags (little endian, siehe _RECORD):
+    Schritt (I), Zeit seit Spielstart in s (d), Ergebnis des Schritts (B, engine.MOVED ... WON),
+    Kopf x (H), Kopf y (H), Länge (I), Rückstand in ms (f)
+"""
+# Standardbibliothek
+from collections import deque
+from logging.handlers import QueueHandler, QueueListener
+from typing import Iterator, Tuple
+import atexit
+import logging
+import queue
+import struct
+import threading
+import time
+
+_RECORD = struct.Struct("<IdBHHIf")
+CAPACITY = 65536 # Einträge im Ringpuffer
+FLUSH_INTERVAL = 0.5 # Sekunden zwischen zwei Schreibvorgängen
+
+_listeners = []
+
+class RawQueueHandler(QueueHandler):
+    """
+    QueueHandler, der die Meldung nicht schon im Spiel-Thread zusammensetzt (QueueHandler.prepare
+    formatiert sie). Der Listener läuft im selben Prozess, der Eintrag kann also unverändert weitergegeben
+    werden; veränderliche Argumente werden dabei erst im Hintergrund gelesen
+    """
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+def queue_file_handler(path: str, level: int, formatter: logging.Formatter) -> RawQueueHandler:
+    """
+    Gibt einen Handler zurück, der Meldungen nur in eine Warteschlange legt. Geschrieben wird die Datei
+    'path' von einem QueueListener im Hintergrund, der beim Beenden des Programms geleert wird
+    """
+    file_handler = logging.FileHandler(path)
+    file_handler.setLevel(level)
+    file_handler.setFormatter(formatter)
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+    listener.start()
+    _listeners.append(listener)
+    handler = RawQueueHandler(log_queue)
+    handler.setLevel(level)
+    return handler
+
+@atexit.register
+def _stop_listeners() -> None:
+    while _listeners:
+        _listeners.pop().stop()
+
+class Telemetry:
+    def __init__(self, path: str, capacity: int = CAPACITY, flush_interval: float = FLUSH_INTERVAL):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.buffer = deque(maxlen=capacity)
+        self.recorded = 0 # Anzahl aller aufgenommenen Einträge
+        self.written = 0
+        self.started = time.perf_counter()
+
+        self._file = open(path, "ab")
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="Telemetry", daemon=True)
+        self._thread.start()
+
+    @property
+    def dropped(self) -> int:
+        """Einträge, die verloren gingen, weil der Ringpuffer voll war"""
+        return self.recorded - self.written - len(self.buffer)
+
+    def record(self, tick: int, status: int, head: Tuple[int, int], length: int, lag: float) -> None:
+        """Nimmt einen Spielschritt auf; formatiert und geschrieben wird erst im Hintergrund"""
+        self.buffer.append((tick, time.perf_counter() - self.started, status, head[0], head[1], length, lag))
+        self.recorded += 1
+
+    def _write(self) -> None:
+        records = []
+        try:
+            while True:
+                records.append(self.buffer.popleft())
+        except IndexError: # Puffer ist leer
+            pass
+        if records:
+            self._file.write(b"".join(_RECORD.pack(*record) for record in records))
+            self._file.flush()
+            self.written += len(records)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            self._write()
+
+    def close(self) -> None:
+        """Beendet den Hintergrund-Thread und schreibt die restlichen Einträge"""
+        self._stop.set()
+        self._thread.join()
+        self._write()
+        self._file.close()
+
+def read(path: str) -> Iterator[tuple]:
+    """Gibt die Einträge einer Telemetriedatei zurück"""
+    with open(path, "rb") as file:
+        data = file.read()
+    return _RECORD.iter_unpack(data[:len(data) - len(data) % _RECORD.size])
@@ -0,0 +1,149 @@
+"""
+Ausschnitt ('Kamera') für Spielfelder, die größer als das Fenster sind.
+
+Das Fenster zeigt nur 'view' Felder um den Kopf der Schlange. Der Hintergrund wird in Stücken von
+CHUNK_SIZE x CHUNK_SIZE Feldern erst erzeugt, wenn sie sichtbar werden, und nur die zuletzt benutzten
+Stücke bleiben im Speicher. Speicher und Zeichenaufwand hängen so von der Fenstergröße ab,
+nicht von der Größe des Spielfelds.
+"""
+# Standardbibliothek
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Tuple
+
+# externe Bibliothek
+import pygame
+
+CHUNK_SIZE = 16 # Felder pro Seite eines Hintergrundstücks
+MAX_CHUNKS = 64 # So viele Hintergrundstücke werden mindestens zwischengespeichert
+
+def desktop_size() -> Optional[Tuple[int, int]]:
+    """Gibt die Auflösung des Bildschirms zurück oder None, falls sie unbekannt ist"""
+    if not hasattr(pygame.display, "get_desktop_sizes"): # erst ab pygame 2.0
+        return None
+    sizes = pygame.display.get_desktop_sizes()
+    if len(sizes) == 0 or sizes[0][0] <= 0 or sizes[0][1] <= 0:
+        return None
+    return sizes[0]
+
+def viewport_size(settings) -> Optional[Tuple[int, int]]:
+    """
+    Gibt die Größe des Ausschnitts in Feldern zurück oder None, falls das ganze Spielfeld angezeigt wird.
+    Ohne 'viewport' in den Einstellungen wird nur dann ein Ausschnitt genutzt, wenn das Spielfeld
+    nicht auf den Bildschirm passt
+    """
+    size = settings.size
+    view = settings.viewport
+    if view is None:
+        desktop = desktop_size()
+        realsize = settings.realsize
+        if desktop is None or (realsize[0] <= desktop[0] and realsize[1] <= desktop[1]):
+            return None
+        view = (desktop[0] // settings.tilesize[0], desktop[1] // settings.tilesize[1])
+    view = (max(1, min(view[0], size[0])), max(1, min(view[1], size[1])))
+    if view == tuple(size):
+        return None
+    return view
+
+class Camera:
+    def __init__(self, board: Tuple[int, int], view: Tuple[int, int], tilesize: Tuple[int, int], texturepack,
+                 margin: Optional[int] = None):
+        self.board = tuple(board)
+        self.view = tuple(view)
+        self.tilesize = tuple(tilesize)
+        self.texturepack = texturepack
+        # Kommt der Kopf näher als 'margin' Felder an den Rand des Ausschnitts, wird er neu ausgerichtet
+        self.margin = max(1, min(self.view) // 4) if margin is None else margin
+        self.x = self.y = 0 # oberes linkes sichtbares Feld
+        self._chunks = OrderedDict() # (Spalte, Zeile) -> Surface, zuletzt benutzte am Ende
+        # Platz für mindestens zwei ganze Ausschnitte, damit beim Verschieben nichts doppelt erzeugt wird
+        visible_chunks = (self.view[0] // CHUNK_SIZE + 2) * (self.view[1] // CHUNK_SIZE + 2)
+        self.max_chunks = max(MAX_CHUNKS, 2 * visible_chunks)
+
+    @property
+    def screensize(self) -> Tuple[int, int]:
+        return self.view[0] * self.tilesize[0], self.view[1] * self.tilesize[1]
+
+    @property
+    def offset(self) -> Tuple[int, int]:
+        """Pixelkoordinaten der oberen linken Ecke des Ausschnitts auf dem Spielfeld"""
+        return self.x * self.tilesize[0], self.y * self.tilesize[1]
+
+    @property
+    def rect(self) -> pygame.Rect:
+        """Sichtbarer Bereich in Pixelkoordinaten des Spielfelds"""
+        return pygame.Rect(self.offset, self.screensize)
+
+    def center(self, cell: Tuple[int, int]) -> None:
+        """Richtet den Ausschnitt mittig auf 'cell' aus, ohne über den Spielfeldrand hinauszugehen"""
+        self.x = min(max(cell[0] - self.view[0] // 2, 0), self.board[0] - self.view[0])
+        self.y = min(max(cell[1] - self.view[1] // 2, 0), self.board[1] - self.view[1])
+
+    def follow(self, cell: Tuple[int, int]) -> bool:
+        """
+        Verschiebt den Ausschnitt, falls 'cell' (der Kopf) zu nah am Rand ist oder außerhalb liegt.
+        Jede Achse wird für sich geprüft und nur verschoben, wenn der Kopf dort den Abstand unterschreitet;
+        liegt der Ausschnitt auf einer Seite schon am Spielfeldrand, ist diese Seite immer in Ordnung.
+        Gibt Wahr zurück, wenn sich der Ausschnitt verschoben hat und alles neu gezeichnet werden muss
+        """
+        x = self._follow_axis(cell[0], self.x, self.view[0], self.board[0])
+        y = self._follow_axis(cell[1], self.y, self.view[1], self.board[1])
+        if (x, y) == (self.x, self.y):
+            return False
+        self.x, self.y = x, y
+        return True
+
+    def _follow_axis(self, position: int, start: int, view: int, board: int) -> int:
+        """Gibt den neuen Anfang des Ausschnitts auf einer Achse zurück"""
+        margin = min(self.margin, (view - 1) // 2)
+        relative = position - start
+        if relative < margin and start > 0 or relative >= view - margin and start < board - view:
+            return min(max(position - view // 2, 0), board - view)
+        return start
+
+    def to_screen(self, rect: pygame.Rect) -> pygame.Rect:
+        return rect.move(-self.x * self.tilesize[0], -self.y * self.tilesize[1])
+
+    def visible(self, rects: Iterable[pygame.Rect]) -> List[pygame.Rect]:
+        """Gibt nur die Rechtecke zurück, die im Ausschnitt liegen"""
+        view = self.rect
+        return [rect for rect in rects if view.colliderect(rect)]
+
+    def chunk(self, column: int, row: int) -> pygame.Surface:
+        """Gibt das Hintergrundstück (column, row) zurück und erzeugt es bei Bedarf"""
+        key = (column, row)
+        if key in self._chunks:
+            self._chunks.move_to_end(key)
+            return self._chunks[key]
+        first_column, first_row = column * CHUNK_SIZE, row * CHUNK_SIZE
+        columns = min(CHUNK_SIZE, self.board[0] - first_column)
+        rows = min(CHUNK_SIZE, self.board[1] - first_row)
+        surface = pygame.Surface((columns * self.tilesize[0], rows * self.tilesize[1]))
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
+        self.texturepack.draw_tiles(surface, first_column, first_row, columns, rows)
+        self._chunks[key] = surface
+        if len(self._chunks) > self.max_chunks:
+            self._chunks.popitem(last=False)
+        return surface
+
+    def background_blits(self, rects: Optional[Iterable[pygame.Rect]] = None) -> list:
+        """
+        Gibt die Argumente für Surface.blits zurück, die den Hintergrund unter 'rects' (Felder in
+        Pixelkoordinaten des Spielfelds) bzw. unter dem ganzen Ausschnitt wiederherstellen
+        """
+        chunk_width, chunk_height = CHUNK_SIZE * self.tilesize[0], CHUNK_SIZE * self.tilesize[1]
+        offset_x, offset_y = self.offset
+        if rects is None: # ganzer Ausschnitt
+            blits = []
+            for row in range(self.y // CHUNK_SIZE, (self.y + self.view[1] - 1) // CHUNK_SIZE + 1):
+                for column in range(self.x // CHUNK_SIZE, (self.x + self.view[0] - 1) // CHUNK_SIZE + 1):
+                    blits.append((self.chunk(column, row), (column * chunk_width - offset_x, row * chunk_height - offset_y)))
+            return blits
+
+        blits = []
+        for rect in rects:
+            # Ein Feld liegt immer vollständig in einem Hintergrundstück
+            column, row = rect.x // chunk_width, rect.y // chunk_height
+            area = rect.move(-column * chunk_width, -row * chunk_height)
+            blits.append((self.chunk(column, row), (rect.x - offset_x, rect.y - offset_y), area))
+        return blits